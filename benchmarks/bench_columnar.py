@@ -0,0 +1,92 @@
+"""
+Compares file size and reload time of the JSON, CSV, Parquet and Arrow IPC
+outputs for a synthetic batch of profiles.
+
+    python benchmarks/bench_columnar.py --rows 1000000
+"""
+import argparse
+import csv
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from outputs.exporter_arrow import ArrowStreamWriter  # noqa: E402
+from outputs.exporter_csv import CsvStreamWriter  # noqa: E402
+from outputs.exporter_json import open_json_writer  # noqa: E402
+
+def make_record(i: int) -> dict:
+    return {
+        "username": f"user_{i}",
+        "full_name": f"User {i}",
+        "followers_count": 1000 + (i * 7919) % 1_000_000,
+        "following_count": i % 997,
+        "bio": "Photographer. Traveller. Coffee.",
+        "profile_url": f"https://www.instagram.com/user_{i}/",
+        "posts_count": i % 3001,
+        "engagement_rate": round((i % 500) / 100, 2),
+        "is_verified": i % 7 == 0,
+        "profile_image": f"https://instagram.com/user_{i}/profile.jpg",
+        "fetched_at": "2025-01-01T00:00:00.000000Z",
+        "source": "live",
+    }
+
+def load_json(path: Path) -> int:
+    with path.open("r", encoding="utf-8") as f:
+        return len(json.load(f))
+
+def load_csv(path: Path) -> int:
+    with path.open("r", encoding="utf-8", newline="") as f:
+        # Typed like the columnar loads, so the comparison is fair.
+        return sum(1 for row in csv.DictReader(f) if int(row["followers_count"]) >= 0)
+
+def load_parquet(path: Path) -> int:
+    import pyarrow.parquet as pq
+
+    return pq.read_table(str(path)).num_rows
+
+def load_arrow(path: Path) -> int:
+    import pyarrow as pa
+
+    with pa.memory_map(str(path)) as source:
+        return pa.ipc.open_file(source).read_all().num_rows
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    p.add_argument("--rows", type=int, default=200_000)
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="igcolumnar-") as tmp:
+        out = Path(tmp)
+        writers = {
+            "json": (out / "profiles.json", lambda path: open_json_writer(path), load_json),
+            "csv": (out / "profiles.csv", lambda path: CsvStreamWriter(path), load_csv),
+            "parquet": (out / "profiles.parquet", lambda path: ArrowStreamWriter(path, "parquet"), load_parquet),
+            "arrow": (out / "profiles.arrow", lambda path: ArrowStreamWriter(path, "arrow"), load_arrow),
+        }
+        baseline = None
+        for name, (path, open_writer, load) in writers.items():
+            start = time.perf_counter()
+            with open_writer(path) as writer:
+                for i in range(args.rows):
+                    writer.write(make_record(i))
+            write_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            rows = load(path)
+            load_s = time.perf_counter() - start
+            assert rows == args.rows, f"{name}: read {rows} rows"
+
+            size_mb = path.stat().st_size / 1e6
+            baseline = baseline or (size_mb, load_s)
+            print(
+                f"{name:<8} {size_mb:8.1f} MB ({baseline[0] / size_mb:5.1f}x smaller)  "
+                f"write {write_s:6.2f} s  load {load_s:6.3f} s ({baseline[1] / load_s:5.1f}x faster)"
+            )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
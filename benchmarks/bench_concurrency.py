@@ -0,0 +1,86 @@
+"""
+Measures fetch throughput at several concurrency levels against a local stub
+server that answers web_profile_info requests after a fixed latency. Exits 1
+if a level's speedup over the first level falls below --min-efficiency of the
+ideal (linear) speedup, or if results go missing or come back out of order.
+
+    python benchmarks/bench_concurrency.py --count 200 --latency-ms 50
+    python benchmarks/bench_concurrency.py --async --count 2000 --levels 1,100,500
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from extractors.fetch_pool import fetch_profiles, fetch_profiles_on_loop  # noqa: E402
+from extractors.instagram_parser import InstagramParser  # noqa: E402
+from stub_server import StubOptions, StubServer  # noqa: E402
+
+def run(count: int, concurrency: int, base_url: str, use_async: bool = False) -> float:
+    parser = InstagramParser(config={
+        "timeout_seconds": 5,
+        "retries": 0,
+        "concurrency": concurrency,
+        "rate_limit": {"rate_per_second": 0},
+        "api_base_url": base_url,
+        "web_base_url": base_url,
+    })
+    usernames = [f"user{i}" for i in range(count)]
+    start = time.perf_counter()
+    if use_async:
+        fetched = fetch_profiles_on_loop(
+            parser.fetch_async, usernames, concurrency, on_close=parser.aclose
+        )
+    else:
+        fetched = fetch_profiles(parser.fetch, usernames, concurrency)
+    results = list(fetched)
+    elapsed = time.perf_counter() - start
+    if [u for u, _ in results] != usernames:
+        raise RuntimeError(f"concurrency={concurrency}: output order changed")
+    missing = [u for u, r in results if not (r.profile and r.profile["username"] == u)]
+    if missing:
+        raise RuntimeError(f"concurrency={concurrency}: {len(missing)} profiles missing, e.g. {missing[0]}")
+    return elapsed
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    p.add_argument("--count", type=int, default=200)
+    p.add_argument("--latency-ms", type=float, default=50.0)
+    p.add_argument("--levels", default="1,2,4,8")
+    p.add_argument("--async", dest="use_async", action="store_true", help="Use the asyncio client.")
+    p.add_argument(
+        "--min-efficiency", type=float, default=0.7,
+        help="Minimum share of the ideal speedup each level must reach. Default: 0.7",
+    )
+    args = p.parse_args()
+
+    server = StubServer(StubOptions(latency_ms=args.latency_ms)).start()
+    base_url = server.base_url
+
+    failed = False
+    try:
+        levels = [int(x) for x in args.levels.split(",")]
+        baseline = None
+        for level in levels:
+            try:
+                elapsed = run(args.count, level, base_url, args.use_async)
+            except RuntimeError as e:
+                print(f"FAIL: {e}")
+                return 1
+            baseline = baseline or elapsed
+            speedup, ideal = baseline / elapsed, level / levels[0]
+            print(
+                f"concurrency={level:<3d} {args.count / elapsed:8.1f} profiles/s "
+                f"speedup={speedup:5.2f}x (ideal {ideal:g}x)"
+            )
+            if speedup < args.min_efficiency * ideal:
+                print(f"FAIL: speedup {speedup:.2f}x is below {args.min_efficiency:.0%} of the ideal {ideal:g}x")
+                failed = True
+    finally:
+        server.stop()
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
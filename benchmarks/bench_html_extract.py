@@ -0,0 +1,73 @@
+"""
+Times HTML fallback parsing over the saved profile pages in benchmarks/fixtures,
+comparing the single-pass extractor with the previous approach of running one
+full-document regex scan per blob type.
+
+    python benchmarks/bench_html_extract.py --pad-kb 300 --repeat 200
+"""
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from stub_server import followers_for, render_page  # noqa: E402
+from extractors.html_extract import extract_profile  # noqa: E402
+from extractors.instagram_parser import InstagramParser  # noqa: E402
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+# Stand-in for the inline JS/CSS bundles that make real profile pages large.
+_FILLER = '<script>(function(){var a="%s";window.__b=a.length;})();</script>\n'
+
+# Handle the fixture placeholders are filled in for.
+USERNAME = "bench_user"
+
+def load_page(path: Path, pad_kb: int) -> str:
+    chunk = _FILLER % ("x" * 1000)
+    pad = chunk * max(1, (pad_kb * 1024) // len(chunk) // 2)
+    return render_page(path.read_text(encoding="utf-8").replace("<!--PAD-->", pad), USERNAME)
+
+def multi_pass(page: str, username: str, normalize_user) -> dict:
+    """The old shape: every strategy rescans the whole document."""
+    for m in re.finditer(r'<script type="application/ld\+json"[^>]*>(.*?)</script>', page, re.DOTALL):
+        blob = json.loads(m.group(1))
+        if "interactionStatistic" in json.dumps(blob):
+            return blob
+    m = re.search(r"window\._sharedData\s*=\s*(\{.*?\});</script>", page, re.DOTALL)
+    if m:
+        return normalize_user(json.loads(m.group(1))["entry_data"]["ProfilePage"][0]["graphql"]["user"])
+    m = re.search(r'<meta[^>]+name="description"[^>]+content="([^"]*)"', page)
+    return {"meta": m.group(1)} if m else None
+
+def timed(fn, page: str, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(page)
+    return (time.perf_counter() - start) / repeat
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    p.add_argument("--pad-kb", type=int, default=300, help="Approximate page size to simulate.")
+    p.add_argument("--repeat", type=int, default=100)
+    args = p.parse_args()
+
+    normalize_user = InstagramParser(config={})._normalize_from_user
+    for path in sorted(FIXTURES.glob("profile_*.html")):
+        page = load_page(path, args.pad_kb)
+        profile = extract_profile(page, "unknown", normalize_user)
+        assert profile and profile["followers_count"] == followers_for(USERNAME), f"wrong counts from {path.name}"
+        new = timed(lambda s: extract_profile(s, "unknown", normalize_user), page, args.repeat)
+        old = timed(lambda s: multi_pass(s, "unknown", normalize_user), page, args.repeat)
+        print(
+            f"{path.name:<26} {len(page) / 1024:6.0f} KB  single-pass {new * 1e3:7.3f} ms  "
+            f"multi-pass {old * 1e3:7.3f} ms  ({old / new:4.1f}x)  "
+            f"followers={profile['followers_count']}"
+        )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""
+Bytes and time per HTML fallback fetch against the local stub server: the
+streamed download (stops once the counts are found) versus reading the whole
+page and then extracting, for each fixture, with and without gzip.
+
+    python benchmarks/bench_html_stream.py --pad-kb 500 --requests 50
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from stub_server import StubOptions, StubServer  # noqa: E402
+from extractors.html_extract import extract_profile  # noqa: E402
+from extractors.instagram_parser import InstagramParser  # noqa: E402
+
+def fetch(parser: InstagramParser, username: str, streamed: bool) -> Tuple[int, int]:
+    """(wire bytes, decoded bytes) for one page, asserting the counts were found."""
+    url = parser._page_url(username)
+    if streamed:
+        page = parser._page_extractor(username)
+        resp = parser.http.get_streamed(url, page.feed, headers=parser._page_headers(),
+                                        max_bytes=parser.html_max_bytes)
+        profile = parser._from_page_stream(resp, page).profile
+        decoded = page.chars
+    else:
+        resp = parser.http.get(url, headers=parser._page_headers())
+        profile = extract_profile(resp.text, username, parser._normalize_from_user)
+        decoded = len(resp.content)
+    assert profile and profile["followers_count"] is not None, f"no counts for {username}"
+    return resp.raw.tell(), decoded
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    p.add_argument("--pad-kb", type=int, default=500, help="Approximate page size to simulate.")
+    p.add_argument("--requests", type=int, default=50)
+    args = p.parse_args()
+
+    for fixture in ("meta", "ld_json", "shared_data"):
+        for gzip in (False, True):
+            server = StubServer(StubOptions(latency_ms=0, html_fixture=fixture, pad_kb=args.pad_kb, gzip=gzip)).start()
+            try:
+                config = {"web_base_url": server.base_url, "retries": 0, "rate_limit": {"rate_per_second": 0}}
+                parser = InstagramParser(config)
+                line = f"{fixture:<12} {'gzip' if gzip else 'plain':<5}"
+                for streamed in (False, True):
+                    wire = decoded = 0
+                    start = time.perf_counter()
+                    for i in range(args.requests):
+                        w, d = fetch(parser, f"user_{i}", streamed)
+                        wire, decoded = wire + w, decoded + d
+                    ms = (time.perf_counter() - start) / args.requests * 1e3
+                    label = "streamed" if streamed else "full"
+                    line += (f"  {label} {wire / args.requests / 1024:6.0f} KB wire "
+                             f"{decoded / args.requests / 1024:6.0f} KB html {ms:6.2f} ms")
+                print(line)
+            finally:
+                server.stop()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""
+Memory held by N profiles as plain dicts versus ProfileRecord, for the case
+where a batch really is held at once: records decoded from JSON (a resumed
+checkpoint journal, --no-network reading the previous output), where every
+record carries its own copy of fetched_at, source and profile_url.
+
+    python benchmarks/bench_record_memory.py --rows 500000
+"""
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from extractors.profile_record import ProfileRecord  # noqa: E402
+
+def make_lines(n: int) -> List[str]:
+    return [
+        json.dumps({
+            "username": f"user_{i}",
+            "full_name": f"User {i}",
+            "followers_count": 1000 + (i * 7919) % 1_000_000,
+            "following_count": i % 997,
+            "bio": "Photographer. Traveller. Coffee.",
+            "profile_url": f"https://www.instagram.com/user_{i}/",
+            "posts_count": i % 3001,
+            "engagement_rate": None,
+            "is_verified": i % 7 == 0,
+            "profile_image": f"https://instagram.com/user_{i}/profile.jpg",
+            "fetched_at": "2025-01-01T00:00:00.000000Z",
+            "source": "live",
+        })
+        for i in range(n)
+    ]
+
+def measure(lines: List[str], build: Callable[[Any], Any]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    held = [build(json.loads(line)) for line in lines]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(held) == len(lines)
+    return current
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    p.add_argument("--rows", type=int, default=500_000)
+    args = p.parse_args()
+
+    lines = make_lines(args.rows)
+    as_dicts = measure(lines, lambda d: d)
+    as_records = measure(lines, ProfileRecord.from_mapping)
+    for name, size in (("dict", as_dicts), ("ProfileRecord", as_records)):
+        print(f"{name:<14} {size / 1e6:8.1f} MB  {size / args.rows:6.0f} B/record")
+    print(f"ProfileRecord uses {as_records / as_dicts:.0%} of the dict memory")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+Startup-time regression check: imports src/main.py under `python -X importtime`
+and fails if the import takes longer than the budget or pulls in a heavy
+dependency that only some code paths need (requests, aiohttp, asyncio,
+pandas, pyarrow, ...). Exits 1 on a regression, listing the slowest imports.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --budget-ms 40 --runs 10
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+# Loaded on demand only: by the network, async, metrics-server, Excel,
+# columnar and batch-validation paths respectively.
+LAZY_MODULES = (
+    "requests",
+    "urllib3",
+    "aiohttp",
+    "asyncio",
+    "http.server",
+    "email.utils",
+    "pandas",
+    "numpy",
+    "pyarrow",
+    "extractors.utils_request",
+    "extractors.async_request",
+    "extractors.html_extract",
+)
+
+def import_times(module: str) -> Dict[str, Tuple[int, int]]:
+    """{module: (self_us, cumulative_us)} for one fresh interpreter importing `module`."""
+    env = dict(os.environ, PYTHONPATH=str(SRC))
+    # Measure what an installed copy sees: bytecode cached after the first run.
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC, env=env, capture_output=True, text=True, check=True,
+    )
+    times: Dict[str, Tuple[int, int]] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    p.add_argument("--module", default="main", help="Module to import from src/. Default: main")
+    p.add_argument("--budget-ms", type=float, default=60.0, help="Maximum cumulative import time. Default: 60")
+    p.add_argument("--runs", type=int, default=5, help="Fresh interpreters to try; the fastest counts.")
+    p.add_argument("--top", type=int, default=10, help="Slowest imports to list.")
+    args = p.parse_args()
+
+    import_times(args.module)  # warm-up: writes .pyc files and fills the page cache
+    runs: List[Dict[str, Tuple[int, int]]] = [import_times(args.module) for _ in range(max(1, args.runs))]
+    best = min(runs, key=lambda t: t[args.module][1])
+    total_ms = best[args.module][1] / 1000
+
+    # Everything imported after site.py finished is attributable to the module.
+    names = list(best)
+    ours = names[names.index("site") + 1:] if "site" in best else names
+    heavy = [m for m in LAZY_MODULES if m in ours]
+
+    print(f"import {args.module}: {total_ms:.1f} ms (best of {len(runs)}; budget {args.budget_ms:.0f} ms)")
+    for name in sorted(ours, key=lambda n: best[n][0], reverse=True)[:args.top]:
+        self_us, cumulative_us = best[name]
+        print(f"  {self_us / 1000:7.2f} ms self  {cumulative_us / 1000:7.2f} ms total  {name}")
+
+    failed = False
+    if heavy:
+        print(f"FAIL: imported eagerly: {', '.join(heavy)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"FAIL: {total_ms:.1f} ms exceeds the {args.budget_ms:.0f} ms budget")
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
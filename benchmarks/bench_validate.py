@@ -0,0 +1,67 @@
+"""
+Times validate_batch against cleaning the same rows one record at a time with
+normalize_username / is_valid_username / parse_count.
+
+    python benchmarks/bench_validate.py --rows 1000000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from extractors.data_cleaner import (  # noqa: E402
+    is_valid_username,
+    normalize_username,
+    parse_count,
+    validate_batch,
+)
+
+_SUFFIXES = ("", "K", "M")
+
+def make_rows(n: int) -> list:
+    return [
+        {
+            "username": f" @User_{i} " if i % 3 else f"https://www.instagram.com/user_{i}/",
+            "followers_count": f"{i % 900}.{i % 10}{_SUFFIXES[i % 3]}" if i % 2 else i,
+            "following_count": str(i % 500),
+            "posts_count": f"{i % 9},{i % 1000:03d}",
+            "fetched_at": "2025-01-01T00:00:00Z",
+        }
+        for i in range(n)
+    ]
+
+def per_record(rows: list) -> int:
+    kept = 0
+    for row in rows:
+        username = normalize_username(row["username"])
+        if not is_valid_username(username):
+            continue
+        counts = [parse_count(row[k]) for k in ("followers_count", "following_count", "posts_count")]
+        if counts[0] is not None:
+            kept += 1
+    return kept
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    p.add_argument("--rows", type=int, default=1_000_000)
+    args = p.parse_args()
+
+    rows = make_rows(args.rows)
+    validate_batch(rows[:10])  # import pandas outside the timed region
+
+    start = time.perf_counter()
+    result = validate_batch(rows)
+    batch = time.perf_counter() - start
+
+    start = time.perf_counter()
+    kept = per_record(rows)
+    loop = time.perf_counter() - start
+
+    assert len(result.clean) == kept, (len(result.clean), kept)
+    print(f"rows={args.rows}  batch {batch:6.2f} s  per-record {loop:6.2f} s  ({loop / batch:4.1f}x)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
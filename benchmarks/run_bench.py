@@ -0,0 +1,203 @@
+"""
+End-to-end benchmark scenarios: runs src/main.py in a subprocess against the
+local stub server for 1k/10k/100k handles and records throughput, per-profile
+p50/p99 latency and peak RSS. Each result is appended to a JSON-lines file
+together with the git commit, so runs on different commits can be compared.
+
+    python benchmarks/run_bench.py --scenarios 1k,10k --concurrency 50
+    python benchmarks/run_bench.py --scenarios 100k --async --concurrency 200 --latency-ms 20
+    python benchmarks/run_bench.py --scenarios 1k --rate-429 0.02 --error-rate 0.01
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from stub_server import StubServer, add_stub_arguments, options_from_args
+
+ROOT = Path(__file__).resolve().parents[1]
+MAIN = ROOT / "src" / "main.py"
+CONFIG_EXAMPLE = ROOT / "src" / "config" / "settings.example.json"
+DEFAULT_RESULTS = Path(__file__).resolve().parent / "results.jsonl"
+
+SCENARIOS = {"1k": 1_000, "10k": 10_000, "100k": 100_000}
+
+def git_revision() -> Dict[str, Any]:
+    def git(*cmd: str) -> str:
+        try:
+            return subprocess.run(
+                ["git", *cmd], cwd=ROOT, capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ""
+
+    return {
+        "commit": git("rev-parse", "--short", "HEAD") or None,
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+    }
+
+def write_settings(path: Path, base_url: str, args: argparse.Namespace) -> None:
+    with CONFIG_EXAMPLE.open("r", encoding="utf-8") as f:
+        cfg = json.load(f)
+    request = cfg["request"]
+    request.update({
+        "api_base_url": base_url,
+        "web_base_url": base_url,
+        "timeout_seconds": 10,
+        "retries": args.retries,
+        "concurrency": args.concurrency,
+        "rate_limit": {"rate_per_second": args.rate_per_second, "burst": max(1, args.concurrency)},
+        "cache": {"enabled": False},
+    })
+    # Synthetic handles must not end up in the real history database, and its
+    # per-record writes are not part of what is being measured.
+    cfg["history"] = {"enabled": False}
+    path.write_text(json.dumps(cfg, indent=2), encoding="utf-8")
+
+def peak_rss_mb(rusage: Any) -> float:
+    # ru_maxrss is kilobytes on Linux and bytes on macOS.
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(rusage.ru_maxrss / scale, 1)
+
+def run_scenario(name: str, count: int, server: StubServer, args: argparse.Namespace, workdir: Path) -> Dict[str, Any]:
+    usernames = workdir / f"{name}.txt"
+    usernames.write_text("".join(f"bench_user_{i}\n" for i in range(count)), encoding="utf-8")
+    settings = workdir / "settings.json"
+    write_settings(settings, server.base_url, args)
+    metrics_path = workdir / f"{name}.metrics.json"
+
+    cmd = [
+        sys.executable, str(MAIN),
+        "--config", str(settings),
+        "-i", str(usernames),
+        "-o", str(workdir / f"{name}.json"),
+        "-c", str(workdir / f"{name}.csv"),
+        "--json-format", args.json_format,
+        "--metrics-json", str(metrics_path),
+        "-j", str(args.concurrency),
+    ]
+    if args.use_async:
+        cmd.append("--async")
+
+    before = server.counters.snapshot()
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    # wait4 gives this child's own rusage; RUSAGE_CHILDREN would be a running max.
+    _, status, rusage = os.wait4(proc.pid, 0)
+    wall = time.perf_counter() - start
+    stderr = proc.stderr.read().decode("utf-8", "replace") if proc.stderr else ""
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{name}: main.py exited with {proc.returncode}\n{stderr[-2000:]}")
+
+    after = server.counters.snapshot()
+    metrics = json.loads(metrics_path.read_text(encoding="utf-8"))
+    fetch = metrics["histograms"].get("profile_fetch_seconds", {})
+    written = metrics.get("profiles_written", 0)
+
+    def ms(value: Optional[float]) -> Optional[float]:
+        return round(value * 1000, 2) if value is not None else None
+
+    return {
+        "scenario": name,
+        "handles": count,
+        "profiles_written": written,
+        "wall_seconds": round(wall, 3),
+        "profiles_per_second": round(written / wall, 1) if wall > 0 else None,
+        "fetch_p50_ms": ms(fetch.get("p50")),
+        "fetch_p99_ms": ms(fetch.get("p99")),
+        "peak_rss_mb": peak_rss_mb(rusage),
+        "server_requests": {k: after.get(k, 0) - before.get(k, 0) for k in after},
+    }
+
+def previous_result(path: Path, result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Most recent result for the same scenario and parameters from another commit."""
+    if not path.exists():
+        return None
+    match = None
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            row = json.loads(line)
+        except ValueError:
+            continue
+        if (
+            row.get("scenario") == result["scenario"]
+            and row.get("params") == result["params"]
+            and row.get("git", {}).get("commit") != result["git"]["commit"]
+        ):
+            match = row
+    return match
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    p.add_argument("--scenarios", default="1k,10k", help=f"Comma-separated, from {','.join(SCENARIOS)}.")
+    p.add_argument("--concurrency", type=int, default=50)
+    p.add_argument("--async", dest="use_async", action="store_true", help="Use the asyncio client.")
+    p.add_argument("--retries", type=int, default=2)
+    p.add_argument("--rate-per-second", type=float, default=0.0,
+                   help="Client-side rate limit per host; 0 disables it.")
+    p.add_argument("--json-format", choices=("array", "ndjson"), default="array")
+    p.add_argument("--results", type=Path, default=DEFAULT_RESULTS, help="JSON-lines file to append to.")
+    p.add_argument("--keep", action="store_true", help="Keep the temporary output directory.")
+    add_stub_arguments(p)
+    args = p.parse_args()
+
+    names = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        p.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    params = {
+        k: v for k, v in vars(args).items() if k not in ("scenarios", "results", "keep")
+    }
+    meta = {
+        "git": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+    server = StubServer(options_from_args(args)).start()
+    workdir = Path(tempfile.mkdtemp(prefix="igbench-"))
+    results: List[Dict[str, Any]] = []
+    try:
+        for name in names:
+            result = run_scenario(name, SCENARIOS[name], server, args, workdir)
+            result.update(params=params, timestamp=time.strftime("%Y-%m-%dT%H:%M:%S"), **meta)
+            results.append(result)
+
+            line = (
+                f"{name:>5}  {result['profiles_per_second']:9.1f} profiles/s  "
+                f"p50={result['fetch_p50_ms']} ms  p99={result['fetch_p99_ms']} ms  "
+                f"rss={result['peak_rss_mb']} MB  wall={result['wall_seconds']} s"
+            )
+            prev = previous_result(args.results, result)
+            if prev and prev.get("profiles_per_second"):
+                line += (
+                    f"  vs {prev['git']['commit']}: "
+                    f"{result['profiles_per_second'] / prev['profiles_per_second']:.2f}x throughput, "
+                    f"{result['peak_rss_mb'] - prev['peak_rss_mb']:+.1f} MB rss"
+                )
+            print(line, flush=True)
+
+            args.results.parent.mkdir(parents=True, exist_ok=True)
+            with args.results.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(result) + "\n")
+    finally:
+        server.stop()
+        if not args.keep:
+            for child in workdir.iterdir():
+                child.unlink()
+            workdir.rmdir()
+        else:
+            print(f"Outputs kept in {workdir}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+"""
+Local stand-in for the Instagram endpoints the scraper calls, for offline
+benchmarks. Serves web_profile_info JSON and profile pages built from the
+HTML fixtures, with configurable latency and injected 429s and errors.
+
+    python benchmarks/stub_server.py --port 8765 --latency-ms 50 --rate-429 0.01
+
+Point a settings file at it with "api_base_url"/"web_base_url" in the
+request block (see run_bench.py).
+"""
+import argparse
+import gzip
+import json
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+# Stand-in for the inline JS/CSS bundles that make real profile pages large.
+_FILLER = '<script>(function(){var a="%s";window.__b=a.length;})();</script>\n'
+
+@dataclass
+class StubOptions:
+    latency_ms: float = 50.0
+    jitter_ms: float = 0.0
+    rate_429: float = 0.0          # share of requests answered 429 + Retry-After
+    error_rate: float = 0.0        # share answered 500/502/503
+    api_fail_rate: float = 0.0     # share of API calls answered 401 (login wall), forcing the HTML fallback
+    missing_prefix: str = "missing_"  # handles with this prefix do not exist (404 on both endpoints)
+    retry_after: int = 1
+    html_fixture: str = "meta"     # meta | ld_json | shared_data
+    pad_kb: int = 0
+    gzip: bool = False             # gzip bodies for clients that accept it
+    seed: Optional[int] = None
+
+class StubCounters:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.counts: Dict[str, int] = {}
+
+    def inc(self, key: str) -> None:
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counts)
+
+def followers_for(username: str) -> int:
+    # Stable per handle, so outputs from different runs can be diffed.
+    return 1000 + (sum(map(ord, username)) * 7919) % 1_000_000
+
+def profile_counts(username: str) -> Tuple[int, int, int]:
+    """(followers, following, posts) served for a handle by both endpoints."""
+    followers = followers_for(username)
+    return followers, followers % 997, followers % 3001
+
+def render_page(template: str, username: str) -> str:
+    """Fill a fixture's {username}, {full_name} and count placeholders for one handle."""
+    followers, following, posts = profile_counts(username)
+    values = {
+        "username": username,
+        "full_name": username.title(),
+        "followers": str(followers),
+        "followers_text": f"{followers:,}",
+        "following": str(following),
+        "posts": str(posts),
+    }
+    # str.format would trip over the JSON braces in the fixtures.
+    for key, value in values.items():
+        template = template.replace("{" + key + "}", value)
+    return template
+
+def load_template(name: str, pad_kb: int) -> str:
+    page = (FIXTURES / f"profile_{name}.html").read_text(encoding="utf-8")
+    chunk = _FILLER % ("x" * 1000)
+    pad = chunk * ((pad_kb * 1024) // len(chunk) // 2) if pad_kb > 0 else ""
+    return page.replace("<!--PAD-->", pad)
+
+def make_handler(options: StubOptions, counters: StubCounters):
+    template = load_template(options.html_fixture, options.pad_kb)
+    rng = random.Random(options.seed)
+    rng_lock = threading.Lock()
+
+    def roll() -> float:
+        with rng_lock:
+            return rng.random()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and a small (gzipped) body go out as separate writes.
+        disable_nagle_algorithm = True
+
+        def handle(self) -> None:
+            try:
+                super().handle()
+            except ConnectionResetError:
+                # Streaming clients drop the connection instead of reusing it.
+                pass
+
+        def do_GET(self) -> None:
+            delay = options.latency_ms
+            if options.jitter_ms:
+                delay += options.jitter_ms * (2 * roll() - 1)
+            if delay > 0:
+                time.sleep(delay / 1000.0)
+
+            parts = urlsplit(self.path)
+            is_api = parts.path.startswith("/api/")
+            counters.inc("api" if is_api else "html")
+
+            r = roll()
+            if r < options.rate_429:
+                counters.inc("429")
+                self._send(429, b'{"message":"Please wait a few minutes"}', "application/json",
+                           {"Retry-After": str(options.retry_after)})
+                return
+            if r < options.rate_429 + options.error_rate:
+                status = (500, 502, 503)[int(r * 1000) % 3]
+                counters.inc(str(status))
+                self._send(status, b"upstream error", "text/plain")
+                return
+
+            if is_api:
+                username = parse_qs(parts.query).get("username", [""])[0]
+                if not username or username.startswith(options.missing_prefix):
+                    counters.inc("404")
+                    self._send(404, b'{"status":"fail"}', "application/json")
+                    return
+                if roll() < options.api_fail_rate:
+                    counters.inc("401")
+                    self._send(401, b'{"message":"Please wait a few minutes before you try again.",'
+                                    b'"require_login":true,"status":"fail"}', "application/json")
+                    return
+                self._send(200, self._api_body(username), "application/json")
+            else:
+                username = parts.path.strip("/").split("/", 1)[0]
+                if not username or username.startswith(options.missing_prefix):
+                    counters.inc("404")
+                    self._send(404, b"not found", "text/plain")
+                    return
+                self._send(200, self._page_body(username), "text/html; charset=utf-8")
+            counters.inc("200")
+
+        def _api_body(self, username: str) -> bytes:
+            followers, following, posts = profile_counts(username)
+            return json.dumps({
+                "data": {"user": {
+                    "id": str(followers),
+                    "username": username,
+                    "full_name": username.title(),
+                    "biography": "Benchmark account",
+                    "is_verified": followers % 7 == 0,
+                    "edge_followed_by": {"count": followers},
+                    "edge_follow": {"count": following},
+                    "edge_owner_to_timeline_media": {"count": posts},
+                }}
+            }).encode("utf-8")
+
+        def _page_body(self, username: str) -> bytes:
+            return render_page(template, username).encode("utf-8")
+
+        def _send(self, status: int, body: bytes, content_type: str,
+                  headers: Optional[Dict[str, str]] = None) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            if options.gzip and "gzip" in self.headers.get("Accept-Encoding", ""):
+                body = gzip.compress(body, compresslevel=6)
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                # A streaming client stopped reading once it had what it needed.
+                counters.inc("aborted")
+                self.close_connection = True
+
+        def log_message(self, *args: Any) -> None:
+            pass
+
+    return Handler
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, options: Optional[StubOptions] = None, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.options = options or StubOptions()
+        self.counters = StubCounters()
+        super().__init__((host, port), make_handler(self.options, self.counters))
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubServer":
+        threading.Thread(target=self.serve_forever, name="stub-server", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+def add_stub_arguments(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--latency-ms", type=float, default=50.0)
+    p.add_argument("--jitter-ms", type=float, default=0.0)
+    p.add_argument("--rate-429", type=float, default=0.0, help="Share of requests answered 429.")
+    p.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered 5xx.")
+    p.add_argument("--api-fail-rate", type=float, default=0.0,
+                   help="Share of API calls answered 401, forcing the HTML fallback.")
+    p.add_argument("--retry-after", type=int, default=1)
+    p.add_argument("--html-fixture", choices=("meta", "ld_json", "shared_data"), default="meta")
+    p.add_argument("--pad-kb", type=int, default=0, help="Approximate extra page size.")
+    p.add_argument("--gzip", action="store_true", help="Compress bodies for clients that accept gzip.")
+    p.add_argument("--seed", type=int, default=1)
+
+def options_from_args(args: argparse.Namespace) -> StubOptions:
+    return StubOptions(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate_429=args.rate_429,
+        error_rate=args.error_rate,
+        api_fail_rate=args.api_fail_rate,
+        retry_after=args.retry_after,
+        html_fixture=args.html_fixture,
+        pad_kb=args.pad_kb,
+        gzip=args.gzip,
+        seed=args.seed,
+    )
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    add_stub_arguments(p)
+    args = p.parse_args()
+
+    server = StubServer(options_from_args(args), args.host, args.port)
+    print(f"Serving on {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.counters.snapshot()))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+import asyncio
+import codecs
+import json
+import logging
+import random
+import time
+from typing import Any, Callable, Dict, Mapping, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from .circuit_breaker import CircuitBreaker
+from .metrics import REGISTRY
+from .proxy_pool import ProxyPool
+from .rate_limiter import RateLimiter, parse_retry_after
+from .utils_request import BACKOFF_FACTOR, RETRY_STATUSES, _DEFAULT_UAS
+
+logger = logging.getLogger(__name__)
+
+class AsyncResponse:
+    """Fully-read response with the subset of the requests.Response surface we use."""
+
+    __slots__ = ("status_code", "text", "url", "headers")
+
+    def __init__(self, status_code: int, text: str, url: str, headers: Mapping[str, str]) -> None:
+        self.status_code = status_code
+        self.text = text
+        self.url = url
+        self.headers = headers
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+class AsyncHttpClient:
+    """
+    asyncio counterpart of HttpClient. One aiohttp session is shared by every
+    request on the loop; its connector caps open connections per host and keeps
+    them alive between requests. Timeout, retry and backoff behaviour mirror the
+    urllib3 Retry policy configured on HttpClient.
+
+    With a proxy pool every attempt picks a proxy, so a retry after a 429 or a
+    connection error goes out through a different one. aiohttp keys pooled
+    connections by proxy, so each proxy keeps its own connections.
+    """
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        rate_limiter: Optional[RateLimiter] = None,
+        proxy_pool: Optional[ProxyPool] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ) -> None:
+        self.timeout = float(config.get("timeout_seconds", 15))
+        self.retries = int(config.get("retries", 2))
+        self.user_agent = config.get("user_agent") or random.choice(_DEFAULT_UAS)
+        self.concurrency = max(1, int(config.get("concurrency", 1)))
+        self.stream_chunk_size = int(config.get("stream_chunk_size", 16384))
+        self.connections_per_host = int(config.get("connections_per_host") or max(20, self.concurrency))
+        self.rate_limiter = rate_limiter or RateLimiter(config.get("rate_limit"))
+        self.breaker = breaker or CircuitBreaker(config.get("circuit_breaker"))
+        self.proxy_pool = proxy_pool or ProxyPool.from_config(config)
+        self.proxies = None if self.proxy_pool else config.get("proxies")
+
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Created lazily: aiohttp sessions must be built inside the running loop.
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=0,
+                limit_per_host=self.connections_per_host,
+                keepalive_timeout=30,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def __aenter__(self) -> "AsyncHttpClient":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.close()
+
+    def _proxy_for(self, url: str) -> Optional[str]:
+        if not self.proxies:
+            return None
+        if isinstance(self.proxies, str):
+            return self.proxies
+        scheme = url.split(":", 1)[0]
+        return self.proxies.get(scheme) or self.proxies.get("all")
+
+    @staticmethod
+    def _backoff(attempt: int, retry_after: Optional[str]) -> float:
+        # Same schedule as urllib3's Retry: no wait before the first retry, then
+        # BACKOFF_FACTOR * 2**(n-1). A Retry-After header takes precedence.
+        delay = parse_retry_after(retry_after)
+        if delay is not None:
+            return delay
+        if attempt <= 1:
+            return 0.0
+        return BACKOFF_FACTOR * (2 ** (attempt - 1))
+
+    async def get(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        allow_redirects: bool = True,
+    ) -> Optional[AsyncResponse]:
+        return await self._get(url, headers, allow_redirects)
+
+    async def get_streamed(
+        self,
+        url: str,
+        consume: Callable[[str], bool],
+        headers: Optional[Dict[str, str]] = None,
+        allow_redirects: bool = True,
+        max_bytes: Optional[int] = None,
+    ) -> Optional[AsyncResponse]:
+        """
+        HttpClient.get_streamed on the event loop: a 200 body goes to `consume`
+        chunk by chunk and the connection is dropped once it returns True or
+        max_bytes have been read. The response's text is empty. aiohttp already
+        asks for, and decodes, every compression it supports.
+        """
+        return await self._get(url, headers, allow_redirects, consume=consume, max_bytes=max_bytes)
+
+    async def _read_body(
+        self,
+        url: str,
+        r: aiohttp.ClientResponse,
+        consume: Callable[[str], bool],
+        max_bytes: Optional[int],
+    ) -> None:
+        decoder = codecs.getincrementaldecoder(r.charset or "utf-8")(errors="replace")
+        read, outcome = 0, "complete"
+        async for chunk in r.content.iter_chunked(self.stream_chunk_size):
+            read += len(chunk)
+            if consume(decoder.decode(chunk)):
+                outcome = "early"
+                break
+            if max_bytes is not None and read >= max_bytes:
+                outcome = "capped"
+                logger.debug("GET %s: stopped reading at the %d byte cap", url, max_bytes)
+                break
+        else:
+            consume(decoder.decode(b"", final=True))
+        if outcome != "complete":
+            # Unread body: close instead of returning the connection to the pool.
+            r.close()
+        REGISTRY.inc("http_body_bytes_total", read, host=urlsplit(url).hostname)
+        REGISTRY.inc("http_streamed_total", outcome=outcome)
+
+    async def _get(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]],
+        allow_redirects: bool,
+        consume: Optional[Callable[[str], bool]] = None,
+        max_bytes: Optional[int] = None,
+    ) -> Optional[AsyncResponse]:
+        hdrs = {
+            "User-Agent": self.user_agent,
+            "Accept": headers.get("Accept", "*/*") if headers else "*/*",
+            "Accept-Language": "en-US,en;q=0.9",
+            "Cache-Control": "no-cache",
+            "Pragma": "no-cache",
+        }
+        if headers:
+            hdrs.update(headers)
+
+        session = self._get_session()
+        host = urlsplit(url).hostname
+        REGISTRY.inc("http_requests_total", host=host)
+        attempt = 0
+        while True:
+            # Every attempt, retries included, waits out an open circuit first.
+            await self.breaker.wait_async(url)
+            pooled = self.proxy_pool.acquire() if self.proxy_pool else None
+            if pooled is not None:
+                proxy, rate_limiter = pooled.url, pooled.rate_limiter
+            else:
+                proxy, rate_limiter = self._proxy_for(url), self.rate_limiter
+            resp: Optional[AsyncResponse] = None
+            error: Optional[BaseException] = None
+            streaming = False
+            start = time.perf_counter()
+            try:
+                # Every attempt, retries included, spends a token from the host bucket.
+                await rate_limiter.acquire_async(url)
+                start = time.perf_counter()
+                async with session.get(
+                    url, headers=hdrs, proxy=proxy, allow_redirects=allow_redirects
+                ) as r:
+                    if consume is None:
+                        text = await r.text(errors="replace")
+                    else:
+                        text = ""
+                        if r.status == 200:
+                            streaming = True
+                            await self._read_body(url, r, consume, max_bytes)
+                    # copy() keeps the CIMultiDict, so header lookups stay case-insensitive.
+                    resp = AsyncResponse(r.status, text, str(r.url), r.headers.copy())
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+            finally:
+                # Also runs on cancellation, so the proxy's in-flight count stays right.
+                if pooled is not None:
+                    self.proxy_pool.release(pooled, resp.status_code if resp is not None else None)
+            REGISTRY.observe("http_request_seconds", time.perf_counter() - start, host=host)
+
+            self.breaker.record(
+                url, resp.status_code if resp is not None else None,
+                resp.headers.get("Retry-After") if resp is not None else None,
+            )
+            if resp is None:
+                # Not after part of a body went to consume: it cannot be unfed.
+                if attempt < self.retries and not streaming:
+                    attempt += 1
+                    REGISTRY.inc("http_retries_total", host=host)
+                    await asyncio.sleep(self._backoff(attempt, None))
+                    continue
+                REGISTRY.inc("http_errors_total", host=host)
+                logger.warning("GET %s failed: %s", url, error)
+                return None
+
+            rate_limiter.observe(url, resp.status_code, resp.headers.get("Retry-After"))
+            if resp.status_code in RETRY_STATUSES and attempt < self.retries:
+                attempt += 1
+                REGISTRY.inc("http_retries_total", host=host)
+                await asyncio.sleep(self._backoff(attempt, resp.headers.get("Retry-After")))
+                continue
+            REGISTRY.inc("http_responses_total", status=resp.status_code)
+            logger.debug("GET %s -> %s", url, resp.status_code)
+            return resp
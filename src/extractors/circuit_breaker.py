@@ -0,0 +1,169 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+from urllib.parse import urlsplit
+
+from .metrics import REGISTRY
+from .rate_limiter import parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+def is_failure(status: Optional[int]) -> bool:
+    """Responses that say the host is struggling or pushing back; None means the request raised."""
+    return status is None or status == 429 or status >= 500
+
+class _Circuit:
+    def __init__(self, window: int) -> None:
+        self.state = CLOSED
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.open_until = 0.0
+        self.probe_started = 0.0
+        self.trips = 0
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker shared by HttpClient and AsyncHttpClient.
+
+    While closed, every response is recorded in a sliding window. Once 429s,
+    5xx and connection errors make up `failure_threshold` of a window of at
+    least `min_samples`, the circuit opens: every fetch to that host waits
+    instead of spending requests on it. After the pause (at least as long as
+    any Retry-After) the circuit goes half-open and lets a single probe
+    through. A healthy probe closes it; a failed one reopens it for twice as
+    long, up to max_open_seconds. The doubling resets once a full window
+    after reopening is healthy again.
+
+    Config (the "circuit_breaker" block of the request settings):
+        enabled                  default true
+        window / min_samples     responses considered when judging the host
+        failure_threshold        share of failures that opens the circuit
+        open_seconds             first pause; doubles up to max_open_seconds
+        probe_timeout_seconds    a probe without a result by then is replaced
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None) -> None:
+        config = config or {}
+        self.enabled = bool(config.get("enabled", True))
+        self.window = max(1, int(config.get("window", 20)))
+        self.min_samples = max(1, int(config.get("min_samples", 10)))
+        self.failure_threshold = float(config.get("failure_threshold", 0.5))
+        self.open_seconds = float(config.get("open_seconds", 30.0))
+        self.max_open_seconds = float(config.get("max_open_seconds", 600.0))
+        self.probe_timeout = float(config.get("probe_timeout_seconds", 30.0))
+
+        self._circuits: Dict[str, _Circuit] = {}
+        self._lock = threading.Lock()
+
+    def _circuit(self, url: str) -> _Circuit:
+        host = (urlsplit(url).hostname or "").lower()
+        circuit = self._circuits.get(host)
+        if circuit is None:
+            circuit = self._circuits.setdefault(host, _Circuit(self.window))
+        return circuit
+
+    def admit(self, url: str) -> float:
+        """0 if a request to url's host may go now, else seconds to wait before asking again."""
+        if not self.enabled:
+            return 0.0
+        with self._lock:
+            circuit = self._circuit(url)
+            if circuit.state == CLOSED:
+                return 0.0
+            now = time.monotonic()
+            if circuit.state == OPEN:
+                if now < circuit.open_until:
+                    return circuit.open_until - now
+                self._transition(url, circuit, HALF_OPEN)
+            elif now - circuit.probe_started < self.probe_timeout:
+                # Someone else's probe is in flight; look again shortly.
+                return min(1.0, self.probe_timeout - (now - circuit.probe_started))
+            circuit.probe_started = now
+            return 0.0
+
+    def wait(self, url: str) -> None:
+        """Block until a request to url's host may go."""
+        waited = 0.0
+        while True:
+            delay = self.admit(url)
+            if delay <= 0:
+                break
+            waited += delay
+            time.sleep(delay)
+        if waited:
+            REGISTRY.observe("circuit_wait_seconds", waited)
+
+    async def wait_async(self, url: str) -> None:
+        waited = 0.0
+        while True:
+            delay = self.admit(url)
+            if delay <= 0:
+                break
+            import asyncio
+
+            waited += delay
+            await asyncio.sleep(delay)
+        if waited:
+            REGISTRY.observe("circuit_wait_seconds", waited)
+
+    def record(self, url: str, status: Optional[int], retry_after: Optional[str] = None) -> None:
+        """Feed back the status of a request to url (None if it raised)."""
+        if not self.enabled:
+            return
+        failed = is_failure(status)
+        with self._lock:
+            circuit = self._circuit(url)
+            if circuit.state == OPEN:
+                # A request admitted before the circuit opened; it changes nothing.
+                return
+            if circuit.state == HALF_OPEN:
+                if failed:
+                    self._open(url, circuit, retry_after)
+                else:
+                    circuit.outcomes.clear()
+                    self._transition(url, circuit, CLOSED)
+                return
+            circuit.outcomes.append(failed)
+            samples = len(circuit.outcomes)
+            if samples < self.min_samples:
+                return
+            share = sum(circuit.outcomes) / samples
+            if share >= self.failure_threshold:
+                self._open(url, circuit, retry_after)
+            elif samples == self.window and not any(circuit.outcomes):
+                circuit.trips = 0
+
+    def _open(self, url: str, circuit: _Circuit, retry_after: Optional[str]) -> None:
+        duration = min(self.max_open_seconds, self.open_seconds * (2 ** circuit.trips))
+        duration = max(duration, parse_retry_after(retry_after) or 0.0)
+        circuit.trips += 1
+        circuit.open_until = time.monotonic() + duration
+        circuit.outcomes.clear()
+        if circuit.state == CLOSED:
+            logger.warning("Pausing requests to %s for %.0fs after repeated 429/5xx", urlsplit(url).hostname, duration)
+        else:
+            logger.info("Probe of %s failed; pausing for %.0fs", urlsplit(url).hostname, duration)
+        self._transition(url, circuit, OPEN)
+
+    def _transition(self, url: str, circuit: _Circuit, state: str) -> None:
+        circuit.state = state
+        REGISTRY.inc("circuit_transitions_total", host=urlsplit(url).hostname, state=state)
+        if state != OPEN:
+            logger.info("Circuit for %s is now %s", urlsplit(url).hostname, state.replace("_", "-"))
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            now = time.monotonic()
+            return {
+                host: {
+                    "state": c.state,
+                    "trips": c.trips,
+                    "open_for_seconds": round(max(0.0, c.open_until - now), 1) if c.state == OPEN else 0.0,
+                }
+                for host, c in self._circuits.items()
+            }
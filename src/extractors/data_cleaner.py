@@ -1,23 +1,104 @@
+import logging
 import re
-from typing import Any, Dict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_URL_PREFIX_RE = re.compile(r"^(?:https?://)?(?:www\.|m\.)?instagram\.com/", re.IGNORECASE)
+# Instagram handles: 1-30 of letters, digits, "." and "_"; no leading/trailing
+# or doubled dots.
+_USERNAME_RE = re.compile(r"^(?!\.)(?!.*\.\.)[a-z0-9._]{1,30}(?<!\.)$")
+# First path segments of instagram.com URLs that are not profiles (posts,
+# reels, IGTV, explore, account pages). /stories/<user>/ names its owner.
+_NON_PROFILE_PATHS = frozenset({"p", "reel", "reels", "tv", "explore", "stories", "accounts"})
 
 def normalize_username(raw: str) -> str:
     """
     Clean up a raw username input: trim spaces, remove leading @,
     strip trailing slashes and query parameters, and lower-case it.
+    Links to posts, reels and other non-profile pages give "" (invalid).
     """
     text = (raw or "").strip()
     if not text:
         return ""
 
     # Remove URL prefix if the user pasted a full Instagram URL
-    text = re.sub(r"^https?://(www\.)?instagram\.com/", "", text, flags=re.IGNORECASE)
+    text = _URL_PREFIX_RE.sub("", text)
 
     # Remove any URL path/query fragments
-    text = text.split("?")[0]
+    text = text.split("?", 1)[0].split("#", 1)[0]
     text = text.strip().lstrip("@").strip("/")
+    text = text.lower()
+    if text.startswith("stories/"):
+        text = text[len("stories/"):]
+    # A profile URL may carry a sub-page such as /reels/; keep the handle only.
+    text = text.split("/", 1)[0]
+    if text in _NON_PROFILE_PATHS:
+        return ""
+
+    return text
+
+_COUNT_RE = re.compile(r"^\s*([0-9][0-9,]*(?:\.[0-9]+)?)\s*([kmb])?\s*$", re.IGNORECASE)
+_COUNT_SUFFIXES = {"k": 1_000, "m": 1_000_000, "b": 1_000_000_000}
+
+def parse_count(value: Any) -> Optional[int]:
+    """
+    Parse a follower/post count as Instagram displays it ("1,234", "283K",
+    "1.2M") into an int. Returns None when the text is not a count.
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    m = _COUNT_RE.match(str(value or ""))
+    if not m:
+        return None
+    number = float(m.group(1).replace(",", ""))
+    suffix = m.group(2)
+    if suffix:
+        number *= _COUNT_SUFFIXES[suffix.lower()]
+    return int(round(number))
 
-    return text.lower()
+def is_valid_username(username: str) -> bool:
+    """True if an already-normalized username is syntactically a valid handle."""
+    return bool(_USERNAME_RE.match(username))
+
+@dataclass
+class InputStats:
+    lines: int = 0
+    kept: int = 0
+    invalid: int = 0
+    duplicates: int = 0
+
+    @property
+    def dropped(self) -> int:
+        return self.invalid + self.duplicates
+
+def iter_clean_usernames(lines: Iterable[str], stats: Optional[InputStats] = None) -> Iterator[str]:
+    """
+    Turn raw input lines into unique, normalized, valid usernames, lazily and
+    in first-seen order. Blank lines and "#" comments are skipped; counts of
+    what was kept and dropped accumulate in `stats`.
+    """
+    stats = stats if stats is not None else InputStats()
+    seen = set()
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        stats.lines += 1
+        username = normalize_username(line)
+        if not is_valid_username(username):
+            stats.invalid += 1
+            logger.debug("Dropping invalid username %r", line)
+            continue
+        if username in seen:
+            stats.duplicates += 1
+            continue
+        seen.add(username)
+        stats.kept += 1
+        yield username
 
 def _ensure_int(value: Any, field: str) -> int:
     if isinstance(value, int):
@@ -35,9 +116,9 @@ def validate_and_clean_record(record: Dict[str, Any]) -> Dict[str, Any]:
     Validate and normalize a scraped record to ensure consistent structure.
     """
     required_fields = ["username", "followersCount", "followingCount", "profileUrl", "timestamp"]
-    for field in required_fields:
-        if field not in record:
-            raise ValueError(f"Missing field '{field}' in record: {record}")
+    for name in required_fields:
+        if name not in record:
+            raise ValueError(f"Missing field '{name}' in record: {record}")
 
     username = normalize_username(record["username"])
     if not username:
@@ -61,4 +142,157 @@ def validate_and_clean_record(record: Dict[str, Any]) -> Dict[str, Any]:
         "followingCount": following,
         "profileUrl": profile_url,
         "timestamp": timestamp,
-    }
\ No newline at end of file
+    }
+
+# Legacy camelCase field names accepted by validate_batch.
+_FIELD_ALIASES = {
+    "followersCount": "followers_count",
+    "followingCount": "following_count",
+    "postsCount": "posts_count",
+    "profileUrl": "profile_url",
+    "timestamp": "fetched_at",
+}
+_COUNT_FIELDS = ("followers_count", "following_count", "posts_count")
+
+def canonical_fields(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    `record` with any legacy camelCase fields (as produced by
+    validate_and_clean_record) renamed to the scraper's snake_case ones. A
+    snake_case value that is already set wins. Records without legacy fields
+    are returned as they are.
+    """
+    if _FIELD_ALIASES.keys().isdisjoint(record):
+        return record
+    out = {k: v for k, v in record.items() if k not in _FIELD_ALIASES}
+    for legacy, name in _FIELD_ALIASES.items():
+        if legacy in record and out.get(name) is None:
+            out[name] = record[legacy]
+    return out
+
+@dataclass
+class BatchResult:
+    """Output of validate_batch: clean rows and one row per rejected input."""
+
+    clean: Any              # pandas.DataFrame
+    rejected: Any           # pandas.DataFrame: index, username, reason
+    reasons: Dict[str, int] = field(default_factory=dict)
+
+    def clean_records(self) -> List[Dict[str, Any]]:
+        return self.clean.astype(object).where(self.clean.notna(), None).to_dict("records")
+
+def _pandas():
+    try:
+        import pandas as pd
+    except ImportError as e:
+        raise RuntimeError("Batch validation needs pandas: pip install pandas") from e
+    return pd
+
+# The vectorized paths below avoid look-arounds and regex flags so pandas can
+# run them on Arrow-backed strings instead of falling back to per-row Python.
+_BATCH_URL_PREFIX = r"^(?:https?://)?(?:www\.|m\.)?instagram\.com/"
+_BATCH_COUNT = r"[0-9]+(?:\.[0-9]+)?[kmb]?"
+
+def _coerce_counts(pd: Any, column: Any) -> Any:
+    """Vectorized parse_count: plain numbers, "1,234", "283K" and "1.2M"."""
+    if pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column):
+        return column.astype("Float64").round().astype("Int64")
+    text = column.astype("string").str.lower().str.replace(r"[\s,]", "", regex=True)
+    ok = text.str.fullmatch(_BATCH_COUNT).fillna(False).astype(bool)
+    suffix = text.str[-1:]
+    scale = pd.Series(1.0, index=column.index)
+    for letter, factor in _COUNT_SUFFIXES.items():
+        scale = scale.mask(suffix == letter, float(factor))
+    digits = text.mask(scale != 1.0, text.str[:-1]).where(ok)
+    number = digits.astype("Float64") * scale
+    return number.round().astype("Int64")
+
+def validate_batch(records: Any, dedupe: bool = True) -> BatchResult:
+    """
+    Validate and normalize many records at once (a list of dicts or a
+    DataFrame), column-wise instead of one dict at a time. Accepts both the
+    scraper's snake_case fields and the legacy camelCase ones.
+
+    Usernames are normalized as normalize_username() does and checked with
+    is_valid_username(); counts are coerced like parse_count(), including
+    "283K"/"1.2M"; profile_url is rebuilt when missing. Rows with an invalid
+    username, a missing or negative followers_count or a negative other count
+    are rejected, as are repeats of the same (username, fetched_at).
+    """
+    pd = _pandas()
+    df = records.copy() if isinstance(records, pd.DataFrame) else pd.DataFrame.from_records(list(records))
+    for legacy, name in _FIELD_ALIASES.items():
+        if legacy in df.columns:
+            df[name] = df[name].fillna(df[legacy]) if name in df.columns else df[legacy]
+            df = df.drop(columns=legacy)
+    if "username" not in df.columns:
+        df["username"] = None
+    raw_username = df["username"]
+
+    username = (
+        raw_username.astype("string")
+        .str.strip()
+        .str.lower()
+        .str.replace(_BATCH_URL_PREFIX, "", regex=True)
+        .str.replace(r"[?#].*$", "", regex=True)
+        .str.strip()
+        .str.lstrip("@")
+        .str.strip("/")
+        .str.replace(r"^stories/", "", regex=True)
+        .str.replace(r"/.*$", "", regex=True)
+    )
+    df["username"] = username
+
+    reason = pd.Series(pd.NA, index=df.index, dtype="string")
+
+    def reject(mask: Any, why: str) -> None:
+        reason[mask.fillna(False).astype(bool) & reason.isna()] = why
+
+    # Same rule as _USERNAME_RE, spelled without look-arounds.
+    valid = (
+        username.str.fullmatch(r"[a-z0-9._]{1,30}")
+        & ~username.str.startswith(".")
+        & ~username.str.endswith(".")
+        & ~username.str.contains("..", regex=False)
+        & ~username.isin(_NON_PROFILE_PATHS)
+    ).fillna(False).astype(bool)
+    reject(~valid, "invalid_username")
+
+    for name in _COUNT_FIELDS:
+        if name not in df.columns:
+            df[name] = pd.Series(pd.NA, index=df.index, dtype="Int64")
+            if name == "followers_count":
+                reject(pd.Series(True, index=df.index), "missing_followers_count")
+            continue
+        raw = df[name]
+        counts = _coerce_counts(pd, raw)
+        df[name] = counts
+        unparsable = counts.isna() & raw.notna()
+        reject(unparsable, f"invalid_{name}")
+        if name == "followers_count":
+            reject(counts.isna(), "missing_followers_count")
+        reject(counts < 0, f"negative_{name}")
+
+    profile_url = df["profile_url"].astype("string") if "profile_url" in df.columns else None
+    default_url = "https://www.instagram.com/" + username + "/"
+    if profile_url is None:
+        df["profile_url"] = default_url
+    else:
+        df["profile_url"] = profile_url.str.strip().where(profile_url.str.startswith("http").fillna(False), default_url)
+
+    if dedupe:
+        keys = ["username", "fetched_at"] if "fetched_at" in df.columns else ["username"]
+        duplicate = df[keys].duplicated(keep="first") & reason.isna()
+        reason[duplicate] = "duplicate"
+
+    bad = reason.notna()
+    rejected = pd.DataFrame({"username": raw_username[bad], "reason": reason[bad]})
+    result = BatchResult(
+        clean=df[~bad].reset_index(drop=True),
+        rejected=rejected,
+        reasons={str(k): int(v) for k, v in reason[bad].value_counts().items()},
+    )
+    logger.info(
+        "Validated %d records: %d clean, %d rejected %s",
+        len(df), len(result.clean), len(rejected), result.reasons,
+    )
+    return result
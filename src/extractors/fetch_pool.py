@@ -0,0 +1,147 @@
+import logging
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (
+    TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Iterable, Iterator, Optional, Tuple
+)
+
+from .outcomes import TRANSIENT, FetchResult
+
+if TYPE_CHECKING:
+    import asyncio
+
+logger = logging.getLogger(__name__)
+
+FetchFn = Callable[[str], FetchResult]
+AsyncFetchFn = Callable[[str], Awaitable[FetchResult]]
+
+_DONE = object()
+
+def _fetch_isolated(fetch: FetchFn, username: str) -> FetchResult:
+    # One bad handle must never take down the rest of the batch; a lookup that
+    # raised is reported like any other transient failure.
+    try:
+        return fetch(username)
+    except Exception as e:
+        logger.exception("Error processing '%s': %s", username, e)
+        return FetchResult(None, TRANSIENT)
+
+def fetch_profiles(
+    fetch: FetchFn,
+    usernames: Iterable[str],
+    concurrency: int = 1,
+) -> Iterator[Tuple[str, FetchResult]]:
+    """
+    Run `fetch` over `usernames` with at most `concurrency` calls in flight and
+    yield (username, FetchResult) pairs in input order. A lookup that raised
+    yields FetchResult(None, TRANSIENT).
+
+    The input is consumed lazily: only a small window of pending lookups is
+    kept, so a generator over a very large file is fine.
+    """
+    concurrency = max(1, int(concurrency or 1))
+    if concurrency == 1:
+        for username in usernames:
+            yield username, _fetch_isolated(fetch, username)
+        return
+
+    # Keep a few more submissions queued than workers so that one slow handle at
+    # the head of the window does not leave the pool idle.
+    window_size = concurrency * 2
+    window: Deque[Tuple[str, "Future[FetchResult]"]] = deque()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="fetch") as pool:
+        for username in usernames:
+            window.append((username, pool.submit(_fetch_isolated, fetch, username)))
+            if len(window) >= window_size:
+                name, fut = window.popleft()
+                yield name, fut.result()
+        while window:
+            name, fut = window.popleft()
+            yield name, fut.result()
+
+async def _fetch_isolated_async(
+    fetch: AsyncFetchFn, username: str, slots: "asyncio.Semaphore"
+) -> FetchResult:
+    async with slots:
+        try:
+            return await fetch(username)
+        except Exception as e:
+            logger.exception("Error processing '%s': %s", username, e)
+            return FetchResult(None, TRANSIENT)
+
+async def fetch_profiles_async(
+    fetch: AsyncFetchFn,
+    usernames: Iterable[str],
+    concurrency: int = 1,
+) -> AsyncIterator[Tuple[str, FetchResult]]:
+    """
+    asyncio variant of fetch_profiles: one task per username, at most
+    `concurrency` awaiting the network at once, results yielded in input order.
+    """
+    import asyncio
+
+    concurrency = max(1, int(concurrency or 1))
+    slots = asyncio.Semaphore(concurrency)
+    window_size = concurrency * 2
+    window: Deque[Tuple[str, "asyncio.Task[FetchResult]"]] = deque()
+    try:
+        for username in usernames:
+            window.append((username, asyncio.ensure_future(_fetch_isolated_async(fetch, username, slots))))
+            if len(window) >= window_size:
+                name, task = window.popleft()
+                yield name, await task
+        while window:
+            name, task = window.popleft()
+            yield name, await task
+    finally:
+        for _, task in window:
+            task.cancel()
+
+def fetch_profiles_on_loop(
+    fetch: AsyncFetchFn,
+    usernames: Iterable[str],
+    concurrency: int = 1,
+    on_close: Optional[Callable[[], Awaitable[None]]] = None,
+) -> Iterator[Tuple[str, FetchResult]]:
+    """
+    Drive fetch_profiles_async on a private event loop in a background thread
+    and expose its results as a plain iterator, so synchronous callers such as
+    main can consume async fetches exactly like fetch_profiles. `on_close` is
+    awaited on that loop once the input is exhausted (e.g. to close sessions).
+    """
+    # asyncio costs ~20 ms to import; only the async path pays for it.
+    import asyncio
+
+    results: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, int(concurrency or 1)) * 2)
+    failure: Dict[str, BaseException] = {}
+
+    async def produce() -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            async for pair in fetch_profiles_async(fetch, usernames, concurrency):
+                # Blocking put off-loop so a slow consumer applies backpressure.
+                await loop.run_in_executor(None, results.put, pair)
+        finally:
+            if on_close is not None:
+                await on_close()
+
+    def run() -> None:
+        try:
+            asyncio.run(produce())
+        except BaseException as e:  # surfaced to the consuming thread below
+            failure["error"] = e
+        finally:
+            results.put(_DONE)
+
+    worker = threading.Thread(target=run, name="fetch-loop", daemon=True)
+    worker.start()
+    while True:
+        item = results.get()
+        if item is _DONE:
+            break
+        yield item
+    worker.join()
+    if "error" in failure:
+        raise failure["error"]
@@ -0,0 +1,214 @@
+import html as html_lib
+import json
+import logging
+import re
+import time
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from .data_cleaner import parse_count
+from .profile_record import ProfileRecord
+
+logger = logging.getLogger(__name__)
+
+UserNormalizer = Callable[[Dict[str, Any]], ProfileRecord]
+
+# Every blob we read lives in a <script> or <meta> tag, so one scan over those
+# tags visits all candidates in page order. The pattern keeps a literal "<"
+# prefix (no IGNORECASE, no top-level alternation) so the regex engine can skip
+# through large inline bundles at memchr speed, and it rejects uninteresting
+# tags itself rather than handing each one back to Python.
+_BLOB_RE = re.compile(
+    r"<(?:"
+    r"""(?P<ld>script\b[^>]*\btype=["']application/ld\+json["'][^>]*>)"""
+    r"""|(?P<data>script\b[^>]*>\s*window\.(?:_sharedData\s*=\s*|__additionalDataLoaded\(\s*['"][^'"]*['"]\s*,\s*))"""
+    r"""|meta\b(?P<meta>[^>]*?(?:name|property)=["'](?:og:)?description["'][^>]*)>"""
+    r")"
+)
+_CONTENT_ATTR_RE = re.compile(r"""\bcontent=(["'])(.*?)\1""", re.IGNORECASE | re.DOTALL)
+_META_COUNTS_RE = re.compile(
+    r"([0-9][0-9.,]*\s*[KMB]?)\s+Followers?\s*,\s*"
+    r"([0-9][0-9.,]*\s*[KMB]?)\s+Following\s*,\s*"
+    r"([0-9][0-9.,]*\s*[KMB]?)\s+Posts?"
+    r"(?:.*?\bfrom\s+(.*?)\s*\(@([A-Za-z0-9._]+)\))?",
+    re.IGNORECASE | re.DOTALL,
+)
+_DECODER = json.JSONDecoder()
+
+def _profile(username: str, **fields: Any) -> ProfileRecord:
+    return ProfileRecord(username, **fields)
+
+def _iter_ld_entities(blob: Any) -> Iterator[Dict[str, Any]]:
+    blobs = blob if isinstance(blob, list) else [blob]
+    for item in blobs:
+        if not isinstance(item, dict):
+            continue
+        for key in ("mainEntity", "mainEntityofPage"):
+            if isinstance(item.get(key), dict):
+                yield {**item, **item[key]}
+        yield item
+
+def _from_ld_json(text: str, username: str) -> Optional[ProfileRecord]:
+    try:
+        blob = json.loads(text)
+    except ValueError:
+        return None
+    for entity in _iter_ld_entities(blob):
+        stats = entity.get("interactionStatistic") or []
+        if isinstance(stats, dict):
+            stats = [stats]
+        counts: Dict[str, Optional[int]] = {}
+        for stat in stats:
+            if not isinstance(stat, dict):
+                continue
+            kind = str(stat.get("interactionType", ""))
+            value = parse_count(stat.get("userInteractionCount"))
+            if value is None:
+                continue
+            if kind.endswith("FollowAction"):
+                counts["followers_count"] = value
+            elif kind.endswith("WriteAction"):
+                counts["posts_count"] = value
+        if "followers_count" not in counts:
+            continue
+        handle = str(entity.get("alternateName") or "").lstrip("@") or username
+        return _profile(
+            handle,
+            full_name=entity.get("name") or "",
+            bio=entity.get("description") or "",
+            profile_image=entity.get("image"),
+            **counts,
+        )
+    return None
+
+def _from_shared_data(data: Any, normalize_user: UserNormalizer) -> Optional[ProfileRecord]:
+    if not isinstance(data, dict):
+        return None
+    try:
+        user = data["entry_data"]["ProfilePage"][0]["graphql"]["user"]
+    except (KeyError, IndexError, TypeError):
+        user = (data.get("graphql") or {}).get("user") or (data.get("data") or {}).get("user")
+    if isinstance(user, dict) and user:
+        return normalize_user(user)
+    return None
+
+def _from_meta(attrs: str, username: str) -> Optional[ProfileRecord]:
+    content = _CONTENT_ATTR_RE.search(attrs)
+    if not content:
+        return None
+    m = _META_COUNTS_RE.search(html_lib.unescape(content.group(2)))
+    if not m:
+        return None
+    handle = m.group(5) or username
+    return _profile(
+        handle,
+        full_name=m.group(4) or "",
+        followers_count=parse_count(m.group(1)),
+        following_count=parse_count(m.group(2)),
+        posts_count=parse_count(m.group(3)),
+    )
+
+# Returned by _read_blob when the page ends inside the blob.
+_INCOMPLETE = object()
+
+def _read_blob(page: str, m: "re.Match[str]", username: str, normalize_user: UserNormalizer, final: bool) -> Any:
+    """
+    Profile from the blob matched by m, or None. Unless `final`, a blob the page
+    ends inside of yields _INCOMPLETE so the caller can retry with more text.
+    Raises ValueError for a complete but unreadable blob.
+    """
+    kind = m.lastgroup
+    if kind == "ld":
+        end = page.find("</script>", m.end())
+        if end < 0:
+            return None if final else _INCOMPLETE
+        return _from_ld_json(page[m.end():end], username)
+    if kind == "data":
+        try:
+            data, _ = _DECODER.raw_decode(page, m.end())
+        except ValueError:
+            if not final and page.find("</script>", m.end()) < 0:
+                return _INCOMPLETE
+            raise
+        return _from_shared_data(data, normalize_user)
+    # The pattern only matches a meta tag once its closing ">" has arrived.
+    return _from_meta(m.group("meta"), username)
+
+def extract_profile(
+    page: str,
+    username: str,
+    normalize_user: UserNormalizer,
+    start: int = 0,
+) -> Optional[ProfileRecord]:
+    """
+    Single pass over a profile page: visit each ld+json script, sharedData /
+    __additionalDataLoaded script and description meta tag in document order,
+    parse only that slice, and return the first one that yields counts.
+
+    `normalize_user` maps a graphql user object (as embedded in sharedData) to a
+    ProfileRecord; InstagramParser passes its API normalizer.
+    """
+    for m in _BLOB_RE.finditer(page, start):
+        try:
+            profile = _read_blob(page, m, username, normalize_user, final=True)
+        except ValueError as e:
+            logger.debug("Skipping unreadable %s blob at %d: %s", m.lastgroup, m.start(), e)
+            continue
+        if profile and profile.get("followers_count") is not None:
+            return profile
+    return None
+
+class IncrementalExtractor:
+    """
+    extract_profile for a page that arrives in pieces. feed() each decoded
+    chunk as it is downloaded; it returns True as soon as a blob with counts
+    has been read, so the caller can stop downloading. A blob the page is cut
+    inside of is retried when more text arrives, and text before the next
+    unread tag is dropped, so the buffer stays small however large the page is.
+    """
+
+    def __init__(self, username: str, normalize_user: UserNormalizer) -> None:
+        self.username = username
+        self.normalize_user = normalize_user
+        self.profile: Optional[ProfileRecord] = None
+        self.chars = 0
+        self.seconds = 0.0
+        self._buf = ""
+
+    def feed(self, text: str) -> bool:
+        """Add the next piece of the page; True once a profile with counts is found."""
+        if self.profile is None and text:
+            self.chars += len(text)
+            self._buf += text
+            self._scan(final=False)
+        return self.profile is not None
+
+    def finish(self) -> Optional[ProfileRecord]:
+        """The profile, reading whatever blob the page (or the byte cap) cut short."""
+        if self.profile is None and self._buf:
+            self._scan(final=True)
+            self._buf = ""
+        return self.profile
+
+    def _scan(self, final: bool) -> None:
+        start = time.perf_counter()
+        buf, pos = self._buf, 0
+        for m in _BLOB_RE.finditer(buf):
+            try:
+                profile = _read_blob(buf, m, self.username, self.normalize_user, final)
+            except ValueError as e:
+                logger.debug("Skipping unreadable %s blob: %s", m.lastgroup, e)
+                profile = None
+            if profile is _INCOMPLETE:
+                pos = m.start()
+                break
+            pos = m.end()
+            if profile and profile.get("followers_count") is not None:
+                self.profile = profile
+                break
+        else:
+            # Every blob tag starts with "<": keep from the last one, which may
+            # be a tag whose end has not arrived yet.
+            last = buf.rfind("<", pos)
+            pos = last if last >= 0 else len(buf)
+        self._buf = "" if self.profile is not None else buf[pos:]
+        self.seconds += time.perf_counter() - start
@@ -1,9 +1,16 @@
-import json
 import logging
-import re
-from typing import Any, Dict, Optional
+import time
+from typing import Any, Dict, List, Optional
 
-from .utils_request import HttpClient
+from .circuit_breaker import CircuitBreaker
+from .data_cleaner import normalize_username
+from .metrics import REGISTRY
+from .outcomes import LOGIN_REQUIRED, NOT_FOUND, OK, TRANSIENT, FetchResult, classify, combine
+from .profile_cache import ProfileCache
+from .profile_record import ProfileRecord
+from .proxy_pool import ProxyPool
+from .rate_limiter import RateLimiter
+from .strategy_stats import StrategySelector
 
 logger = logging.getLogger(__name__)
 
@@ -12,73 +19,261 @@ class InstagramParser:
     Fetches and parses public Instagram profile metrics.
     Tries multiple strategies:
       1) Web profile API endpoint (may work without auth intermittently)
-      2) Embedded JSON within HTML (ld+json / shared data)
-      3) Lightweight HTML heuristics as a last resort
+      2) The profile HTML page: embedded JSON (ld+json / shared data), then
+         counts from the description meta tag
+    The API is tried first until StrategySelector has seen enough results to
+    prefer whichever strategy is currently cheaper per successful lookup.
 
-    Returns a normalized dict or None if all strategies fail.
+    fetch() returns a FetchResult: the normalized profile, or None with the
+    reason (not found, login wall, rate limited, transient failure).
+    fetch_profile() returns just the profile; the *_async variants run the
+    same strategies on an asyncio event loop.
+    When a ProfileCache is given, fresh cached profiles are returned without
+    touching the network and every successful fetch is written back to it;
+    handles found not to exist are remembered there for a shorter while.
+    With read_cache=False the cache is only written, never consulted.
     """
 
-    def __init__(self, config: Dict[str, Any]) -> None:
-        self.http = HttpClient(config=config)
+    def __init__(
+        self, config: Dict[str, Any], cache: Optional[ProfileCache] = None, read_cache: bool = True
+    ) -> None:
+        self.config = config
+        self.cache = cache
+        self.read_cache = read_cache
+        # One limiter for both clients so sync and async traffic share a budget.
+        self.rate_limiter = RateLimiter(config.get("rate_limit"))
+        # Likewise one breaker: a host that is failing is failing for both.
+        self.breaker = CircuitBreaker(config.get("circuit_breaker"))
+        self.proxy_pool = ProxyPool.from_config(config)
+        self._http = None
+        self._ahttp = None
+        # Overridable so the parser can be pointed at a local stand-in server.
+        self.api_base = str(config.get("api_base_url") or "https://i.instagram.com").rstrip("/")
+        self.web_base = str(config.get("web_base_url") or "https://www.instagram.com").rstrip("/")
+        # "api" = web_profile_info JSON endpoint, "html" = profile page fallback.
+        self.strategies = StrategySelector.from_config(["api", "html"], config.get("strategy"))
+        # Hard cap on the (decompressed) HTML read per profile page; the counts
+        # are normally found, and the download stopped, well before it.
+        self.html_max_bytes = int(config.get("html_max_bytes", 2 * 1024 * 1024) or 0) or None
 
-    def fetch_profile(self, username: str) -> Optional[Dict[str, Any]]:
-        username = username.strip().lstrip("@")
+    @property
+    def http(self):
+        """
+        HttpClient, created on first live fetch: requests and urllib3 take
+        tens of milliseconds to import, which a run served from the cache
+        never needs.
+        """
+        if self._http is None:
+            from .utils_request import HttpClient
+
+            self._http = HttpClient(
+                config=self.config, rate_limiter=self.rate_limiter, proxy_pool=self.proxy_pool, breaker=self.breaker
+            )
+        return self._http
+
+    @property
+    def ahttp(self):
+        """AsyncHttpClient sharing this parser's config, created on first async use."""
+        if self._ahttp is None:
+            from .async_request import AsyncHttpClient
+
+            self._ahttp = AsyncHttpClient(
+                config=self.config, rate_limiter=self.rate_limiter, proxy_pool=self.proxy_pool, breaker=self.breaker
+            )
+        return self._ahttp
+
+    def strategy_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-strategy attempt/success counters and sliding-window figures."""
+        return self.strategies.snapshot()
+
+    async def aclose(self) -> None:
+        if self._ahttp is not None:
+            await self._ahttp.close()
+
+    def fetch(self, username: str) -> FetchResult:
+        """Look up one profile: the profile, or None and why (see extractors.outcomes)."""
+        username = normalize_username(username)
         if not username:
+            return FetchResult(None, NOT_FOUND)
+        cached = self._from_cache(username)
+        if cached is not None:
+            return cached
+
+        with REGISTRY.timer("profile_fetch_seconds"):
+            result = self._fetch_live(username)
+        self._remember(username, result)
+        return result
+
+    async def fetch_async(self, username: str) -> FetchResult:
+        """Same strategies as fetch, awaiting on the shared AsyncHttpClient."""
+        username = normalize_username(username)
+        if not username:
+            return FetchResult(None, NOT_FOUND)
+        cached = self._from_cache(username)
+        if cached is not None:
+            return cached
+
+        with REGISTRY.timer("profile_fetch_seconds"):
+            result = await self._fetch_live_async(username)
+        self._remember(username, result)
+        return result
+
+    def fetch_profile(self, username: str) -> Optional[ProfileRecord]:
+        return self.fetch(username).profile
+
+    async def fetch_profile_async(self, username: str) -> Optional[ProfileRecord]:
+        return (await self.fetch_async(username)).profile
+
+    def _from_cache(self, username: str) -> Optional[FetchResult]:
+        if self.cache is None or not self.read_cache:
             return None
+        cached = self.cache.get(username)
+        if cached:
+            return FetchResult(cached, OK)
+        # Handles that recently turned out not to exist are not tried again until the entry expires.
+        missed = self.cache.get_miss(username)
+        if missed:
+            return FetchResult(None, missed)
+        return None
 
-        # Try official-ish web endpoint first
-        api_url = f"https://i.instagram.com/api/v1/users/web_profile_info/?username={username}"
-        resp = self.http.get(
-            api_url,
-            headers={
-                "User-Agent": self.http.user_agent,
-                "X-IG-App-ID": "936619743392459",
-                "Accept": "application/json",
-                "Referer": f"https://www.instagram.com/{username}/",
-            },
-            allow_redirects=True,
-        )
-        if resp and resp.status_code == 200:
-            try:
-                data = resp.json()
-                user = (
-                    data.get("data", {})
-                    .get("user", {})
+    def _remember(self, username: str, result: FetchResult) -> None:
+        REGISTRY.inc("profile_outcomes_total", outcome=result.outcome)
+        if self.cache is None:
+            return
+        if result.profile:
+            self.cache.put(username, result.profile)
+        elif result.outcome == NOT_FOUND:
+            self.cache.put_miss(username, result.outcome)
+
+    def _fetch_live(self, username: str) -> FetchResult:
+        # Strategies are tried cheapest-first according to recent results.
+        outcomes = []
+        for name in self.strategies.order():
+            start = time.perf_counter()
+            if name == "api":
+                resp = self.http.get(self._api_url(username), headers=self._api_headers(username), allow_redirects=True)
+                result = self._from_api_response(resp)
+            else:
+                page = self._page_extractor(username)
+                resp = self.http.get_streamed(
+                    self._page_url(username), page.feed, headers=self._page_headers(),
+                    allow_redirects=True, max_bytes=self.html_max_bytes,
                 )
-                if user:
-                    return self._normalize_from_user(user)
-            except Exception as e:
-                logger.debug("API JSON parse failed: %s", e)
-
-        # Fallback: fetch HTML and parse embedded JSON
-        page_url = f"https://www.instagram.com/{username}/"
-        resp = self.http.get(
-            page_url,
-            headers={"User-Agent": self.http.user_agent, "Accept": "text/html"},
-            allow_redirects=True,
-        )
-        if resp and resp.status_code == 200 and resp.text:
-            # Try ld+json
-            normalized = self._parse_ld_json(resp.text)
-            if normalized:
-                return normalized
-
-            # Try sharedData / additionalDataLoaded legacy blobs
-            normalized = self._parse_shared_data(resp.text)
-            if normalized:
-                return normalized
-
-            # Heuristic fallback
-            normalized = self._heuristic_counts(resp.text, username)
-            if normalized:
-                return normalized
-
-        logger.warning("All strategies failed for '%s'", username)
-        return None
+                result = self._from_page_stream(resp, page)
+            self._record_strategy(name, result.outcome, time.perf_counter() - start)
+            if result.profile:
+                return result
+            if result.outcome == NOT_FOUND:
+                # The account does not exist; the other strategy would only say so again.
+                break
+            outcomes.append(result.outcome)
+        return self._failed(username, outcomes)
+
+    async def _fetch_live_async(self, username: str) -> FetchResult:
+        http = self.ahttp
+        outcomes = []
+        for name in self.strategies.order():
+            start = time.perf_counter()
+            if name == "api":
+                resp = await http.get(self._api_url(username), headers=self._api_headers(username), allow_redirects=True)
+                result = self._from_api_response(resp)
+            else:
+                page = self._page_extractor(username)
+                resp = await http.get_streamed(
+                    self._page_url(username), page.feed, headers=self._page_headers(),
+                    allow_redirects=True, max_bytes=self.html_max_bytes,
+                )
+                result = self._from_page_stream(resp, page)
+            self._record_strategy(name, result.outcome, time.perf_counter() - start)
+            if result.profile:
+                return result
+            if result.outcome == NOT_FOUND:
+                break
+            outcomes.append(result.outcome)
+        return self._failed(username, outcomes)
+
+    def _failed(self, username: str, outcomes: List[str]) -> FetchResult:
+        outcome = combine(outcomes) if outcomes else NOT_FOUND
+        if outcome == NOT_FOUND:
+            logger.info("Profile '%s' does not exist", username)
+        else:
+            logger.warning("All strategies failed for '%s' (%s)", username, outcome)
+        return FetchResult(None, outcome)
+
+    def _record_strategy(self, name: str, outcome: str, seconds: float) -> None:
+        # A definitive "no such account" is the strategy working, not failing.
+        ok = outcome in (OK, NOT_FOUND)
+        self.strategies.record(name, ok, seconds)
+        REGISTRY.inc("strategy_attempts_total", strategy=name, result="ok" if ok else "fail")
+
+    # ------------------ Requests ------------------
+
+    def _api_url(self, username: str) -> str:
+        return f"{self.api_base}/api/v1/users/web_profile_info/?username={username}"
+
+    def _api_headers(self, username: str) -> Dict[str, str]:
+        return {
+            "User-Agent": self.http.user_agent,
+            "X-IG-App-ID": "936619743392459",
+            "Accept": "application/json",
+            "Referer": f"https://www.instagram.com/{username}/",
+        }
+
+    def _page_url(self, username: str) -> str:
+        return f"{self.web_base}/{username}/"
+
+    def _page_headers(self) -> Dict[str, str]:
+        return {"User-Agent": self.http.user_agent, "Accept": "text/html"}
+
+    def _from_api_response(self, resp: Any) -> FetchResult:
+        if resp is None:
+            return FetchResult(None, TRANSIENT)
+        if resp.status_code == 200:
+            with REGISTRY.timer("parse_seconds", kind="api"):
+                return self._parse_api_body(resp)
+        return FetchResult(None, classify(resp.status_code, resp.url))
+
+    def _parse_api_body(self, resp: Any) -> FetchResult:
+        try:
+            data = resp.json()
+            user = (
+                data.get("data", {})
+                .get("user", {})
+            )
+            if user:
+                return FetchResult(self._normalize_from_user(user), OK)
+            if data.get("require_login"):
+                return FetchResult(None, LOGIN_REQUIRED)
+            if user is None and data.get("status") == "ok":
+                # {"data": {"user": null}, "status": "ok"}: no such account.
+                return FetchResult(None, NOT_FOUND)
+        except Exception as e:
+            logger.debug("API JSON parse failed: %s", e)
+        return FetchResult(None, classify(resp.status_code, resp.url))
+
+    def _page_extractor(self, username: str) -> Any:
+        # ld+json, sharedData / additionalDataLoaded and meta description,
+        # located in one scan as the page downloads; the first blob with counts
+        # wins and ends the download. Imported here because its patterns are
+        # compiled on import and the API strategy usually succeeds without them.
+        from .html_extract import IncrementalExtractor
+
+        return IncrementalExtractor(username, self._normalize_from_user)
+
+    def _from_page_stream(self, resp: Any, page: Any) -> FetchResult:
+        if resp is None:
+            return FetchResult(None, TRANSIENT)
+        if resp.status_code == 200:
+            profile = page.finish()
+            REGISTRY.observe("parse_seconds", page.seconds, kind="html")
+            if profile:
+                return FetchResult(profile, OK)
+        # A login wall arrives as a 200 after a redirect to the login page.
+        return FetchResult(None, classify(resp.status_code, resp.url))
 
     # ------------------ Parsers ------------------
 
-    def _normalize_from_user(self, user: Dict[str, Any]) -> Dict[str, Any]:
+    def _normalize_from_user(self, user: Dict[str, Any]) -> ProfileRecord:
         def _get(*keys, default=None):
             node = user
             for k in keys:
@@ -87,19 +282,15 @@ class InstagramParser:
                 node = node.get(k)
             return node if node is not None else default
 
-        return {
-            "username": _get("username", default=""),
-            "full_name": _get("full_name", default=""),
-            "followers_count": _get("edge_followed_by", "count", default=_get("follower_count", default=0)),
-            "following_count": _get("edge_follow", "count", default=_get("following_count", default=0)),
-            "bio": _get("biography", default=""),
-            "profile_url": f"https://www.instagram.com/{_get('username', default='')}/",
-            "posts_count": _get("edge_owner_to_timeline_media", "count", default=_get("media_count", default=0)),
-            "engagement_rate": None,  # cannot compute without recent posts; left None here
-            "is_verified": bool(_get("is_verified", default=False)),
-            "profile_image": _get("profile_pic_url_hd", default=_get("profile_pic_url", default=None)),
-        }
-
-    def _parse_ld_json(self, html: str) -> Optional[Dict[str, Any]]:
-        # Instagram sometimes embeds JSON-LD with basic attributes
-        for m in re.finditer(
\ No newline at end of file
+        # profile_url is derived from the username; engagement_rate cannot be
+        # computed without recent posts and is left None.
+        return ProfileRecord(
+            username=_get("username", default=""),
+            full_name=_get("full_name", default=""),
+            followers_count=_get("edge_followed_by", "count", default=_get("follower_count", default=0)),
+            following_count=_get("edge_follow", "count", default=_get("following_count", default=0)),
+            bio=_get("biography", default=""),
+            posts_count=_get("edge_owner_to_timeline_media", "count", default=_get("media_count", default=0)),
+            is_verified=bool(_get("is_verified", default=False)),
+            profile_image=_get("profile_pic_url_hd", default=_get("profile_pic_url", default=None)),
+        )
@@ -0,0 +1,217 @@
+import bisect
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# Seconds. Wide enough for both sub-millisecond parsing and slow, retried requests.
+DEFAULT_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+class _Histogram:
+    __slots__ = ("bounds", "counts", "total", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        # Linear interpolation inside the bucket holding the q-th observation.
+        if not self.total:
+            return None
+        rank = q * self.total
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else lower * 2 or 1.0
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.bounds[-1]
+
+class MetricsRegistry:
+    """
+    Process-wide counters, gauges and fixed-bucket histograms. Recording is a
+    dict lookup and an integer add under one lock, so it stays on in
+    production. Rendered as a JSON summary or in Prometheus text format.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.started = time.monotonic()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started = time.monotonic()
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def observe(self, name: str, seconds: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = _Histogram(self.buckets)
+            hist.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels: Any) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def counter_value(self, name: str, **labels: Any) -> float:
+        with self._lock:
+            series = self._counters.get(name, {})
+            if labels:
+                return series.get(_label_key(labels), 0)
+            return sum(series.values())
+
+    # ------------------ Rendering ------------------
+
+    @staticmethod
+    def _series_name(name: str, key: LabelKey) -> str:
+        if not key:
+            return name
+        return name + "{" + ",".join(f"{k}={v}" for k, v in key) + "}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            uptime = time.monotonic() - self.started
+            counters = {
+                self._series_name(n, k): v for n, series in self._counters.items() for k, v in series.items()
+            }
+            gauges = {
+                self._series_name(n, k): v for n, series in self._gauges.items() for k, v in series.items()
+            }
+            histograms = {}
+            for n, series in self._histograms.items():
+                for k, h in series.items():
+                    histograms[self._series_name(n, k)] = {
+                        "count": h.total,
+                        "sum": round(h.sum, 6),
+                        "mean": round(h.sum / h.total, 6) if h.total else None,
+                        "p50": h.quantile(0.50),
+                        "p90": h.quantile(0.90),
+                        "p99": h.quantile(0.99),
+                    }
+        return {
+            "uptime_seconds": round(uptime, 3),
+            "counters": counters,
+            "gauges": gauges,
+            "histograms": histograms,
+        }
+
+    def to_prometheus(self, prefix: str = "igscraper_") -> str:
+        def fmt_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+            pairs = list(key) + ([extra] if extra else [])
+            if not pairs:
+                return ""
+            escaped = (v.replace("\\", "\\\\").replace('"', '\\"') for _, v in pairs)
+            return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+        lines: List[str] = []
+        with self._lock:
+            for n, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE {prefix}{n} counter")
+                lines.extend(f"{prefix}{n}{fmt_labels(k)} {v}" for k, v in series.items())
+            for n, series in sorted(self._gauges.items()):
+                lines.append(f"# TYPE {prefix}{n} gauge")
+                lines.extend(f"{prefix}{n}{fmt_labels(k)} {v}" for k, v in series.items())
+            for n, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {prefix}{n} histogram")
+                for k, h in series.items():
+                    cumulative = 0
+                    for bound, count in zip(self.buckets, h.counts):
+                        cumulative += count
+                        lines.append(f"{prefix}{n}_bucket{fmt_labels(k, ('le', repr(bound)))} {cumulative}")
+                    lines.append(f"{prefix}{n}_bucket{fmt_labels(k, ('le', '+Inf'))} {h.total}")
+                    lines.append(f"{prefix}{n}_sum{fmt_labels(k)} {h.sum}")
+                    lines.append(f"{prefix}{n}_count{fmt_labels(k)} {h.total}")
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path: Path, extra: Optional[Dict[str, Any]] = None) -> None:
+        summary = self.to_dict()
+        if extra:
+            summary.update(extra)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        logger.info("Wrote metrics summary to %s", path)
+
+    def write_prometheus(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(self.to_prometheus(), encoding="utf-8")
+        # Atomic swap so a node_exporter textfile collector never sees a partial file.
+        tmp.replace(path)
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> "ThreadingHTTPServer":
+        """Serve GET /metrics in Prometheus format from a daemon thread."""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.to_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+        logger.info("Serving metrics on http://%s:%d/metrics", host, server.server_address[1])
+        return server
+
+# Shared by every component in the process.
+REGISTRY = MetricsRegistry()
@@ -0,0 +1,44 @@
+from typing import Iterable, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+from .profile_record import ProfileRecord
+
+# Why a lookup ended the way it did. Only NOT_FOUND is definitive for the
+# account; a login wall is usually about our client (IP, missing session),
+# not the profile, and the rest are worth retrying later.
+OK = "ok"
+NOT_FOUND = "not_found"
+LOGIN_REQUIRED = "login_required"
+RATE_LIMITED = "rate_limited"
+TRANSIENT = "transient"
+
+# When no strategy succeeded, the overall outcome is the first of these seen.
+_PRECEDENCE = (NOT_FOUND, RATE_LIMITED, LOGIN_REQUIRED, TRANSIENT)
+
+_LOGIN_PATHS = ("/accounts/login", "/challenge")
+
+class FetchResult(NamedTuple):
+    """A profile lookup: the profile (None unless outcome is OK) and its outcome."""
+
+    profile: Optional[ProfileRecord]
+    outcome: str
+
+def classify(status: Optional[int], url: Optional[str] = None) -> str:
+    """
+    Outcome of a strategy request that produced no profile. `status` is None
+    when the request raised; `url` is the final URL after redirects.
+    """
+    if status is None or status >= 500:
+        return TRANSIENT
+    if status == 429:
+        return RATE_LIMITED
+    if status == 404:
+        return NOT_FOUND
+    if status in (401, 403) or (url and urlsplit(url).path.startswith(_LOGIN_PATHS)):
+        return LOGIN_REQUIRED
+    return TRANSIENT
+
+def combine(outcomes: Iterable[str]) -> str:
+    """Overall outcome of a lookup in which every strategy failed."""
+    seen = set(outcomes)
+    return next((o for o in _PRECEDENCE if o in seen), TRANSIENT)
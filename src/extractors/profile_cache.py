@@ -0,0 +1,183 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Union
+
+from .data_cleaner import normalize_username
+from .metrics import REGISTRY
+from .profile_record import ProfileRecord
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    username    TEXT PRIMARY KEY,
+    data        TEXT NOT NULL,
+    fetched_at  REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS profiles_accessed_at ON profiles (accessed_at);
+CREATE TABLE IF NOT EXISTS misses (
+    username    TEXT PRIMARY KEY,
+    outcome     TEXT NOT NULL,
+    checked_at  REAL NOT NULL
+);
+"""
+
+def connect_wal(path: Path, timeout: float = 30.0, **kwargs: Any) -> sqlite3.Connection:
+    """
+    Autocommit connection in WAL mode. Sharded runs open the same database
+    from several processes at once, and switching a new file to WAL needs an
+    exclusive lock that SQLite does not wait for, so retry until `timeout`.
+    """
+    conn = sqlite3.connect(str(path), isolation_level=None, timeout=timeout, **kwargs)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            break
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) or time.monotonic() > deadline:
+                conn.close()
+                raise
+            time.sleep(0.05)
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+class ProfileCache:
+    """
+    SQLite-backed cache of normalized profiles, keyed by normalize_username().
+
+    Entries older than `ttl_seconds` are treated as misses. Once the table grows
+    past `max_entries`, expired rows and then the least recently read rows are
+    evicted. Safe to share between fetch threads.
+
+    Definitive misses (a handle that does not exist) are kept in a separate
+    table for `negative_ttl_seconds`, so dead handles in a list are not
+    fetched again on every run; 0 disables this.
+    """
+
+    # Eviction is a table scan, so only run it every so many writes.
+    EVICT_EVERY = 500
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        ttl_seconds: float = 86400,
+        max_entries: int = 200_000,
+        negative_ttl_seconds: float = 21600,
+    ) -> None:
+        self.path = Path(path)
+        self.ttl_seconds = float(ttl_seconds)
+        self.max_entries = int(max_entries)
+        self.negative_ttl_seconds = float(negative_ttl_seconds)
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = connect_wal(self.path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]], root: Path) -> Optional["ProfileCache"]:
+        """Build a cache from the request.cache settings block, or None if disabled."""
+        if not config or not config.get("enabled", True):
+            return None
+        path = Path(config.get("path") or "data/profile_cache.sqlite3")
+        if not path.is_absolute():
+            path = root / path
+        return cls(
+            path,
+            ttl_seconds=float(config.get("ttl_seconds", 86400)),
+            max_entries=int(config.get("max_entries", 200_000)),
+            negative_ttl_seconds=float(config.get("negative_ttl_seconds", 21600)),
+        )
+
+    def get(self, username: str) -> Optional[ProfileRecord]:
+        key = normalize_username(username)
+        if not key:
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, fetched_at FROM profiles WHERE username = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                self.misses += 1
+                REGISTRY.inc("cache_requests_total", result="miss")
+                return None
+            self._conn.execute("UPDATE profiles SET accessed_at = ? WHERE username = ?", (now, key))
+            self.hits += 1
+            REGISTRY.inc("cache_requests_total", result="hit")
+
+        profile = ProfileRecord.from_mapping(json.loads(row[0]))
+        profile.fetched_at = datetime.fromtimestamp(row[1], timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+        profile.source = "cache"
+        return profile
+
+    def get_miss(self, username: str) -> Optional[str]:
+        """Outcome recorded by put_miss() if it is still fresh, else None."""
+        key = normalize_username(username)
+        if not key or self.negative_ttl_seconds <= 0:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT outcome FROM misses WHERE username = ? AND checked_at >= ?",
+                (key, time.time() - self.negative_ttl_seconds),
+            ).fetchone()
+            if row is None:
+                return None
+            self.negative_hits += 1
+            REGISTRY.inc("cache_requests_total", result="negative")
+        return row[0]
+
+    def put_miss(self, username: str, outcome: str) -> None:
+        key = normalize_username(username)
+        if not key or self.negative_ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO misses (username, outcome, checked_at) VALUES (?, ?, ?)",
+                (key, outcome, time.time()),
+            )
+
+    def put(self, username: str, profile: Mapping[str, Any]) -> None:
+        key = normalize_username(username)
+        if not key:
+            return
+        data = {k: v for k, v in profile.items() if k not in ("fetched_at", "source")}
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO profiles (username, data, fetched_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(data, ensure_ascii=False), now, now),
+            )
+            self._conn.execute("DELETE FROM misses WHERE username = ?", (key,))
+            self._writes += 1
+            if self._writes % self.EVICT_EVERY == 0:
+                self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        self._conn.execute("DELETE FROM profiles WHERE fetched_at < ?", (now - self.ttl_seconds,))
+        self._conn.execute("DELETE FROM misses WHERE checked_at < ?", (now - self.negative_ttl_seconds,))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM profiles").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM profiles WHERE username IN "
+                "(SELECT username FROM profiles ORDER BY accessed_at LIMIT ?)",
+                (excess,),
+            )
+            logger.info("Evicted %d least recently used cache entries", excess)
+
+    def close(self) -> None:
+        with self._lock:
+            self._evict(time.time())
+            self._conn.close()
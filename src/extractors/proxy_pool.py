@@ -0,0 +1,204 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Union
+
+from .metrics import REGISTRY
+from .rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+OK = "ok"
+THROTTLED = "throttled"
+ERROR = "error"
+
+def classify(status: Optional[int]) -> str:
+    """Outcome of one request for proxy health; None means the request raised."""
+    if status is None or status == 407 or status >= 500:
+        return ERROR
+    if status == 429:
+        return THROTTLED
+    return OK
+
+class Proxy:
+    """
+    One upstream proxy: its own per-host rate budget, an in-flight count and a
+    sliding window of recent outcomes that drives quarantine.
+    """
+
+    def __init__(self, url: str, rate_limiter: RateLimiter, max_in_flight: int, window: int) -> None:
+        self.url = url
+        self.rate_limiter = rate_limiter
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.quarantined_until = 0.0
+        self.quarantines = 0
+        self.outcomes: Deque[str] = deque(maxlen=max(1, int(window)))
+
+    @property
+    def label(self) -> str:
+        # Never put credentials into logs or metric labels.
+        scheme, sep, rest = self.url.partition("://")
+        return scheme + sep + rest.rsplit("@", 1)[-1] if sep else self.url.rsplit("@", 1)[-1]
+
+    @property
+    def requests_proxies(self) -> Dict[str, str]:
+        return {"http": self.url, "https": self.url}
+
+    def load(self) -> float:
+        return self.in_flight / self.max_in_flight
+
+class ProxyPool:
+    """
+    Spreads requests over several proxies so throughput scales with the number
+    provisioned and one throttled proxy does not stall the run.
+
+    Selection is round-robin or least-loaded over healthy proxies; proxies at
+    their in-flight cap are passed over while others have room. A proxy whose
+    recent error or 429 share crosses the threshold is quarantined, for twice
+    as long each consecutive time. When the quarantine expires it gets traffic
+    again; once it has a full healthy sample again the backoff starts over.
+
+    Config (the "proxy_pool" block of the request settings, used when
+    "proxies" is a list):
+        strategy                 "round_robin" (default) or "least_loaded"
+        max_in_flight            concurrent requests per proxy
+        rate_limit               per-proxy rate budget, same shape as request.rate_limit
+        window / min_samples     outcomes considered when judging health
+        error_threshold          share of errors that quarantines a proxy
+        throttle_threshold       share of 429s that quarantines a proxy
+        quarantine_seconds       first quarantine; doubles up to max_quarantine_seconds
+    """
+
+    def __init__(
+        self,
+        proxies: Sequence[Union[str, Dict[str, Any]]],
+        strategy: str = "round_robin",
+        max_in_flight: int = 10,
+        rate_limit: Optional[Dict[str, Any]] = None,
+        window: int = 50,
+        min_samples: int = 10,
+        error_threshold: float = 0.5,
+        throttle_threshold: float = 0.2,
+        quarantine_seconds: float = 60.0,
+        max_quarantine_seconds: float = 900.0,
+    ) -> None:
+        if strategy not in ("round_robin", "least_loaded"):
+            raise ValueError(f"Unknown proxy selection strategy: {strategy}")
+        self.strategy = strategy
+        self.min_samples = max(1, int(min_samples))
+        self.error_threshold = float(error_threshold)
+        self.throttle_threshold = float(throttle_threshold)
+        self.quarantine_seconds = float(quarantine_seconds)
+        self.max_quarantine_seconds = float(max_quarantine_seconds)
+
+        self.proxies: List[Proxy] = []
+        for entry in proxies:
+            spec = {"url": entry} if isinstance(entry, str) else dict(entry)
+            if not spec.get("url"):
+                raise ValueError(f"Proxy entry without a url: {entry!r}")
+            self.proxies.append(Proxy(
+                spec["url"],
+                RateLimiter(spec.get("rate_limit", rate_limit)),
+                int(spec.get("max_in_flight", max_in_flight)),
+                window,
+            ))
+        if not self.proxies:
+            raise ValueError("Proxy pool needs at least one proxy")
+
+        self._cursor = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["ProxyPool"]:
+        """Build a pool from the request settings, or None unless "proxies" is a list."""
+        proxies = config.get("proxies")
+        if not isinstance(proxies, list) or not proxies:
+            return None
+        pool_cfg = config.get("proxy_pool") or {}
+        return cls(
+            proxies,
+            strategy=pool_cfg.get("strategy", "round_robin"),
+            max_in_flight=int(pool_cfg.get("max_in_flight", 10)),
+            rate_limit=pool_cfg.get("rate_limit", config.get("rate_limit")),
+            window=int(pool_cfg.get("window", 50)),
+            min_samples=int(pool_cfg.get("min_samples", 10)),
+            error_threshold=float(pool_cfg.get("error_threshold", 0.5)),
+            throttle_threshold=float(pool_cfg.get("throttle_threshold", 0.2)),
+            quarantine_seconds=float(pool_cfg.get("quarantine_seconds", 60.0)),
+            max_quarantine_seconds=float(pool_cfg.get("max_quarantine_seconds", 900.0)),
+        )
+
+    def acquire(self) -> Proxy:
+        """Pick a proxy and count the request against it; pair with release()."""
+        with self._lock:
+            now = time.monotonic()
+            healthy = [p for p in self.proxies if p.quarantined_until <= now]
+            if not healthy:
+                # Everything is quarantined: use whichever comes back first rather
+                # than failing the run outright.
+                healthy = [min(self.proxies, key=lambda p: p.quarantined_until)]
+            candidates = [p for p in healthy if p.in_flight < p.max_in_flight] or healthy
+
+            n = len(self.proxies)
+            if self.strategy == "least_loaded":
+                # Ties go to the proxy after the cursor so equal loads still rotate.
+                proxy = min(
+                    candidates,
+                    key=lambda p: (p.load(), (self.proxies.index(p) - self._cursor) % n),
+                )
+            else:
+                proxy = min(candidates, key=lambda p: (self.proxies.index(p) - self._cursor) % n)
+            self._cursor = (self.proxies.index(proxy) + 1) % n
+
+            proxy.in_flight += 1
+            proxy.requests += 1
+            return proxy
+
+    def release(self, proxy: Proxy, status: Optional[int]) -> None:
+        """Record the final status of a request (None if it raised) and settle health."""
+        outcome = classify(status)
+        REGISTRY.inc("proxy_requests_total", proxy=proxy.label, outcome=outcome)
+        with self._lock:
+            proxy.in_flight = max(0, proxy.in_flight - 1)
+            proxy.outcomes.append(outcome)
+            if outcome != OK:
+                proxy.failures += 1
+            self._judge(proxy)
+
+    def _judge(self, proxy: Proxy) -> None:
+        samples = len(proxy.outcomes)
+        if samples < self.min_samples:
+            return
+        errors = sum(1 for o in proxy.outcomes if o == ERROR) / samples
+        throttled = sum(1 for o in proxy.outcomes if o == THROTTLED) / samples
+        if errors < self.error_threshold and throttled < self.throttle_threshold:
+            # Healthy over a full sample since the last quarantine: recovered.
+            proxy.quarantines = 0
+            return
+        duration = min(self.max_quarantine_seconds, self.quarantine_seconds * (2 ** proxy.quarantines))
+        proxy.quarantines += 1
+        proxy.quarantined_until = time.monotonic() + duration
+        proxy.outcomes.clear()
+        REGISTRY.inc("proxy_quarantines_total", proxy=proxy.label)
+        logger.warning(
+            "Quarantining proxy %s for %.0fs (errors %.0f%%, throttled %.0f%%)",
+            proxy.label, duration, errors * 100, throttled * 100,
+        )
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            now = time.monotonic()
+            return {
+                p.label: {
+                    "requests": p.requests,
+                    "failures": p.failures,
+                    "in_flight": p.in_flight,
+                    "quarantines": p.quarantines,
+                    "quarantined_for_seconds": round(max(0.0, p.quarantined_until - now), 1),
+                }
+                for p in self.proxies
+            }
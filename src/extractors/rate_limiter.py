@@ -0,0 +1,159 @@
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+from .metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RATE_PER_SECOND = 2.0
+DEFAULT_BURST = 5
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After as seconds; accepts both delta-seconds and HTTP-date forms."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    # HTTP-dates are rare and email.utils pulls in socket; import on demand.
+    from email.utils import parsedate_to_datetime
+
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+class TokenBucket:
+    """
+    Token bucket that hands out reservations instead of blocking: reserve()
+    takes a token (letting the balance go negative) and returns how long the
+    caller must wait before sending. The same bucket therefore serves threads
+    (time.sleep) and coroutines (asyncio.sleep) without holding a lock while
+    waiting, and callers are served in arrival order.
+
+    On a 429 the rate is halved (never below min_rate) and, if the server sent
+    Retry-After, the bucket is closed until then. The rate then climbs back
+    towards the configured value by 10% of it every `recover_seconds`.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        min_rate: Optional[float] = None,
+        recover_seconds: float = 30.0,
+    ) -> None:
+        self.base_rate = float(rate)
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self.min_rate = float(min_rate) if min_rate else self.base_rate / 16.0
+        self.recover_seconds = float(recover_seconds)
+
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._last_penalty = 0.0
+        self._lock = threading.Lock()
+
+    def _advance(self, now: float) -> None:
+        if self.rate < self.base_rate and now - self._last_penalty >= self.recover_seconds:
+            steps = int((now - self._last_penalty) // self.recover_seconds)
+            self.rate = min(self.base_rate, self.rate + steps * self.base_rate * 0.1)
+            self._last_penalty += steps * self.recover_seconds
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(float(self.burst), self._tokens + elapsed * self.rate)
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._advance(now)
+            self._tokens -= 1.0
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._blocked_until - now)
+
+    def penalize(self, retry_after: Optional[float] = None) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._advance(now)
+            self.rate = max(self.min_rate, self.rate / 2.0)
+            self._last_penalty = now
+            # Drop any saved-up burst: it is exactly what got us throttled.
+            self._tokens = min(self._tokens, 0.0)
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+
+class RateLimiter:
+    """
+    Per-host token buckets shared by HttpClient and AsyncHttpClient.
+
+    Config (the "rate_limit" block of the request settings):
+        rate_per_second / burst   defaults for every host; rate <= 0 disables limiting
+        hosts                     {"i.instagram.com": {"rate_per_second": 1, "burst": 3}, ...}
+        recover_seconds           how fast a penalised rate climbs back
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None) -> None:
+        config = config or {}
+        self.rate = float(config.get("rate_per_second", DEFAULT_RATE_PER_SECOND) or 0)
+        self.burst = int(config.get("burst", DEFAULT_BURST))
+        self.recover_seconds = float(config.get("recover_seconds", 30.0))
+        self.host_overrides: Dict[str, Dict[str, Any]] = dict(config.get("hosts") or {})
+
+        self._buckets: Dict[str, Optional[TokenBucket]] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url: str) -> Optional[TokenBucket]:
+        host = (urlsplit(url).hostname or "").lower()
+        bucket = self._buckets.get(host, False)
+        if bucket is not False:
+            return bucket
+        with self._lock:
+            if host not in self._buckets:
+                override = self.host_overrides.get(host, {})
+                rate = float(override.get("rate_per_second", self.rate) or 0)
+                burst = int(override.get("burst", self.burst))
+                self._buckets[host] = (
+                    TokenBucket(rate, burst, recover_seconds=self.recover_seconds) if rate > 0 else None
+                )
+            return self._buckets[host]
+
+    def acquire(self, url: str) -> None:
+        bucket = self.bucket(url)
+        if bucket is not None:
+            wait = bucket.reserve()
+            REGISTRY.observe("rate_limit_wait_seconds", wait)
+            if wait > 0:
+                time.sleep(wait)
+
+    async def acquire_async(self, url: str) -> None:
+        bucket = self.bucket(url)
+        if bucket is not None:
+            wait = bucket.reserve()
+            REGISTRY.observe("rate_limit_wait_seconds", wait)
+            if wait > 0:
+                import asyncio
+
+                await asyncio.sleep(wait)
+
+    def observe(self, url: str, status: int, retry_after: Optional[str] = None) -> None:
+        """Feed a response status back so 429s (and 503 + Retry-After) slow the host down."""
+        if status != 429 and not (status == 503 and retry_after):
+            return
+        REGISTRY.inc("rate_limited_total", host=urlsplit(url).hostname, status=status)
+        bucket = self.bucket(url)
+        if bucket is not None:
+            bucket.penalize(parse_retry_after(retry_after))
+            logger.info(
+                "Rate limited by %s (HTTP %s); rate now %.2f req/s",
+                urlsplit(url).hostname, status, bucket.rate,
+            )
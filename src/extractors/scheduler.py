@@ -0,0 +1,149 @@
+import heapq
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from .data_cleaner import normalize_username
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIER = "default"
+
+@dataclass
+class Tier:
+    name: str
+    sla_seconds: float      # an account is due once its data is this old
+    rank: int               # breaks ties between equally overdue accounts; lower first
+
+@dataclass
+class ScheduleStats:
+    candidates: int = 0
+    due: int = 0
+    fresh: int = 0
+    backing_off: int = 0
+    scheduled: int = 0
+
+class RefreshScheduler:
+    """
+    Decides which accounts a refresh run fetches, most overdue first, within
+    a request budget.
+
+    Each account belongs to a tier with a freshness SLA. Its lateness is its
+    age divided by that SLA, with the SLA shortened for fast-changing accounts
+    (1% follower change per day halves it). Accounts with lateness below 1 are
+    fresh and skipped. Accounts never fetched are treated as maximally overdue.
+    After consecutive failures an account is held back for
+    backoff_seconds * 2**(failures - 1), capped at max_backoff_seconds.
+
+    Due accounts go into a heap and are popped lazily, so a small budget over
+    a large list costs O(n + budget log n) rather than a full sort.
+
+    `states` maps usernames to objects with last_checked, change_rate,
+    failures and last_failed attributes (see outputs.history_store.AccountState).
+    """
+
+    def __init__(
+        self,
+        tiers: Optional[Iterable[Tier]] = None,
+        default_sla_seconds: float = 86400.0,
+        backoff_seconds: float = 3600.0,
+        max_backoff_seconds: float = 7 * 86400.0,
+    ) -> None:
+        self.tiers: Dict[str, Tier] = {t.name: t for t in (tiers or ())}
+        self.tiers.setdefault(DEFAULT_TIER, Tier(DEFAULT_TIER, float(default_sla_seconds), len(self.tiers)))
+        self.backoff_seconds = float(backoff_seconds)
+        self.max_backoff_seconds = float(max_backoff_seconds)
+        self.membership: Dict[str, str] = {}
+        self.stats = ScheduleStats()
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]], root: Path, default_sla_seconds: float) -> "RefreshScheduler":
+        """
+        Build from the "schedule" settings block:
+
+            {"tiers": [{"name": "hot", "sla_seconds": 3600, "usernames_file": "data/hot.txt"}],
+             "backoff_seconds": 3600, "max_backoff_seconds": 604800}
+
+        Accounts not listed in any tier file use the default SLA.
+        """
+        config = config or {}
+        specs = list(config.get("tiers") or [])
+        tiers = [Tier(spec["name"], float(spec["sla_seconds"]), rank) for rank, spec in enumerate(specs)]
+        scheduler = cls(
+            tiers,
+            default_sla_seconds=default_sla_seconds,
+            backoff_seconds=float(config.get("backoff_seconds", 3600)),
+            max_backoff_seconds=float(config.get("max_backoff_seconds", 7 * 86400)),
+        )
+        for spec in specs:
+            if spec.get("usernames_file"):
+                path = Path(spec["usernames_file"])
+                scheduler.load_tier_file(spec["name"], path if path.is_absolute() else root / path)
+        return scheduler
+
+    def load_tier_file(self, tier: str, path: Path) -> None:
+        if tier not in self.tiers:
+            raise ValueError(f"Unknown tier: {tier}")
+        if not path.exists():
+            logger.info("Tier file %s for tier '%s' not found", path, tier)
+            return
+        added = 0
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                username = normalize_username(line)
+                # First tier listed wins when an account appears in several.
+                if username and username not in self.membership:
+                    self.membership[username] = tier
+                    added += 1
+        logger.info("Tier '%s': %d accounts from %s", tier, added, path)
+
+    def tier_of(self, username: str) -> Tier:
+        return self.tiers[self.membership.get(username, DEFAULT_TIER)]
+
+    def backoff_until(self, state: Any) -> float:
+        failures = getattr(state, "failures", 0) or 0
+        if not failures or state.last_failed is None:
+            return 0.0
+        delay = min(self.max_backoff_seconds, self.backoff_seconds * 2 ** (failures - 1))
+        return state.last_failed + delay
+
+    def lateness(self, state: Any, tier: Tier, now: float) -> float:
+        if state is None or state.last_checked is None:
+            return float("inf")
+        sla = tier.sla_seconds / (1.0 + 100.0 * (state.change_rate or 0.0))
+        return (now - state.last_checked) / sla if sla > 0 else float("inf")
+
+    def plan(
+        self,
+        usernames: Iterable[str],
+        states: Mapping[str, Any],
+        budget: Optional[int] = None,
+        now: Optional[float] = None,
+    ) -> Iterator[str]:
+        """Yield due usernames in priority order, at most `budget` of them."""
+        now = time.time() if now is None else now
+        heap: List[Tuple[float, int, int, str]] = []
+        stats = self.stats = ScheduleStats()
+        for seq, username in enumerate(usernames):
+            stats.candidates += 1
+            state = states.get(username)
+            if state is not None and self.backoff_until(state) > now:
+                stats.backing_off += 1
+                continue
+            tier = self.tier_of(username)
+            late = self.lateness(state, tier, now)
+            if late < 1.0:
+                stats.fresh += 1
+                continue
+            # Min-heap: most overdue first, then tier rank, then input order.
+            heap.append((-late, tier.rank, seq, username))
+        heapq.heapify(heap)
+        stats.due = len(heap)
+
+        remaining = len(heap) if budget is None else max(0, budget)
+        while heap and remaining:
+            yield heapq.heappop(heap)[3]
+            stats.scheduled += 1
+            remaining -= 1
@@ -0,0 +1,43 @@
+import logging
+from typing import Iterable, Iterator, Tuple
+
+logger = logging.getLogger(__name__)
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """Parse "i/N" (0 <= i < N) into (i, N)."""
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{spec}': expected i/N, e.g. 0/4") from None
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard '{spec}': need 0 <= i < N")
+    return index, count
+
+def _jump_hash(key: int, buckets: int) -> int:
+    # Lamping & Veach jump consistent hash: growing N to N+1 moves only ~1/(N+1)
+    # of the keys, so rerunning with more shards keeps most checkpoints useful.
+    b, j = -1, 0
+    while j < buckets:
+        b = j
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        j = int((b + 1) * (float(1 << 31) / float((key >> 33) + 1)))
+    return b
+
+def shard_of(username: str, shards: int) -> int:
+    """
+    Shard of an already-normalized username. Stable across processes,
+    machines and Python versions (unlike hash(), which is salted per process).
+    """
+    import hashlib  # not at module level: unsharded runs should not pay for it
+
+    digest = hashlib.blake2b(username.encode("utf-8"), digest_size=8).digest()
+    return _jump_hash(int.from_bytes(digest, "big"), shards)
+
+def iter_shard(usernames: Iterable[str], index: int, shards: int) -> Iterator[str]:
+    """Keep only the usernames that belong to shard `index` of `shards`."""
+    if shards == 1:
+        yield from usernames
+        return
+    for username in usernames:
+        if shard_of(username, shards) == index:
+            yield username
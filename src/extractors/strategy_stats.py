@@ -0,0 +1,107 @@
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+class StrategySelector:
+    """
+    Orders fetch strategies by recent performance.
+
+    Each strategy keeps a sliding window of (succeeded, seconds) samples. The
+    cheapest expected cost per success -- mean latency divided by success rate
+    -- goes first. Strategies with fewer than `min_samples` samples rank after
+    every measured strategy that is succeeding but ahead of any that is failing
+    outright, in their configured order; a cold start therefore behaves like
+    the fixed order. Every `probe_every`-th call promotes one of the others to
+    the front in turn, so a strategy that was failing is noticed once it recovers.
+    """
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        window: int = 100,
+        probe_every: int = 25,
+        min_samples: int = 5,
+    ) -> None:
+        self.names = list(names)
+        self.window = max(1, int(window))
+        self.probe_every = max(0, int(probe_every))
+        self.min_samples = max(1, int(min_samples))
+
+        self._samples: Dict[str, Deque[Tuple[bool, float]]] = {
+            n: deque(maxlen=self.window) for n in self.names
+        }
+        self._attempts: Dict[str, int] = {n: 0 for n in self.names}
+        self._successes: Dict[str, int] = {n: 0 for n in self.names}
+        self._first: Dict[str, int] = {n: 0 for n in self.names}
+        self._calls = 0
+        self._probe_cursor = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, names: Sequence[str], config: Optional[Dict[str, Any]]) -> "StrategySelector":
+        config = config or {}
+        return cls(
+            names,
+            window=int(config.get("window", 100)),
+            probe_every=int(config.get("probe_every", 25)),
+            min_samples=int(config.get("min_samples", 5)),
+        )
+
+    def _cost(self, name: str) -> Optional[float]:
+        samples = self._samples[name]
+        if len(samples) < self.min_samples:
+            return None
+        successes = sum(1 for ok, _ in samples if ok)
+        if not successes:
+            return float("inf")
+        mean_latency = sum(t for _, t in samples) / len(samples)
+        return max(mean_latency, 1e-3) * len(samples) / successes
+
+    def order(self) -> List[str]:
+        with self._lock:
+            self._calls += 1
+            default_rank = {n: i for i, n in enumerate(self.names)}
+            costs = {n: self._cost(n) for n in self.names}
+
+            def rank(n: str) -> Tuple[int, float, int]:
+                cost = costs[n]
+                if cost is None:
+                    return (1, 0.0, default_rank[n])
+                if cost == float("inf"):
+                    return (2, 0.0, default_rank[n])
+                return (0, cost, default_rank[n])
+
+            ranked = sorted(self.names, key=rank)
+            if self.probe_every and len(ranked) > 1 and self._calls % self.probe_every == 0:
+                others = ranked[1:]
+                probe = others[self._probe_cursor % len(others)]
+                self._probe_cursor += 1
+                ranked.remove(probe)
+                ranked.insert(0, probe)
+            self._first[ranked[0]] += 1
+            return ranked
+
+    def record(self, name: str, ok: bool, seconds: float) -> None:
+        with self._lock:
+            self._samples[name].append((bool(ok), float(seconds)))
+            self._attempts[name] += 1
+            if ok:
+                self._successes[name] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Lifetime counters plus current window figures, per strategy."""
+        with self._lock:
+            out: Dict[str, Dict[str, Any]] = {}
+            for n in self.names:
+                samples = self._samples[n]
+                window_ok = sum(1 for ok, _ in samples if ok)
+                out[n] = {
+                    "attempts": self._attempts[n],
+                    "successes": self._successes[n],
+                    "tried_first": self._first[n],
+                    "window_success_rate": round(window_ok / len(samples), 3) if samples else None,
+                    "window_mean_latency_ms": (
+                        round(1000 * sum(t for _, t in samples) / len(samples), 1) if samples else None
+                    ),
+                }
+            return out
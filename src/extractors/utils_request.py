@@ -1,15 +1,28 @@
+import codecs
 import logging
 import random
+import threading
 import time
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlsplit
 
 import requests
 from requests import Response
 from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
 from urllib3.util.retry import Retry
 
+from .circuit_breaker import CircuitBreaker
+from .metrics import REGISTRY
+from .proxy_pool import Proxy, ProxyPool
+from .rate_limiter import RateLimiter
+
 logger = logging.getLogger(__name__)
 
+# Shared with AsyncHttpClient so both clients retry the same way.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+BACKOFF_FACTOR = 0.5
+
 _DEFAULT_UAS = [
     # A small pool of realistic desktop UAs
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -19,26 +32,195 @@ _DEFAULT_UAS = [
 ]
 
 class HttpClient:
-    def __init__(self, config: Dict[str, Any]) -> None:
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        rate_limiter: Optional[RateLimiter] = None,
+        proxy_pool: Optional[ProxyPool] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ) -> None:
         self.timeout = float(config.get("timeout_seconds", 15))
         self.retries = int(config.get("retries", 2))
-        self.proxies = config.get("proxies")
         self.user_agent = config.get("user_agent") or random.choice(_DEFAULT_UAS)
-        self.delay_ms_min = int(config.get("delay_ms_min", 300))
-        self.delay_ms_max = int(config.get("delay_ms_max", 900))
+        self.concurrency = max(1, int(config.get("concurrency", 1)))
+        self.stream_chunk_size = int(config.get("stream_chunk_size", 16384))
+        self.rate_limiter = rate_limiter or RateLimiter(config.get("rate_limit"))
+        self.breaker = breaker or CircuitBreaker(config.get("circuit_breaker"))
+        # A list of proxies becomes a pool; a single value is passed through as before.
+        self.proxy_pool = proxy_pool or ProxyPool.from_config(config)
+        self.proxies = None if self.proxy_pool else config.get("proxies")
+
+        self.session = self._new_session()
+        # Pooled proxies each get their own session, and with it their own
+        # keep-alive connection pool.
+        self._proxy_sessions: Dict[str, requests.Session] = {}
+        self._sessions_lock = threading.Lock()
 
-        self.session = requests.Session()
+    def _new_session(self) -> requests.Session:
+        session = requests.Session()
         retry = Retry(
             total=self.retries,
             connect=self.retries,
             read=self.retries,
-            backoff_factor=0.5,
-            status_forcelist=(429, 500, 502, 503, 504),
+            backoff_factor=BACKOFF_FACTOR,
+            status_forcelist=RETRY_STATUSES,
             allowed_methods=frozenset(["GET", "HEAD"]),
             raise_on_status=False,
         )
-        adapter = HTTPAdapter(max_retries=retry, pool_maxsize=20)
-        self.session.mount("https://", adapter)
-        self.session.mount("http://", adapter)
+        # One pooled connection per worker thread, so concurrent fetches reuse
+        # keep-alive connections instead of discarding them.
+        adapter = HTTPAdapter(max_retries=retry, pool_maxsize=max(20, self.concurrency))
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def warm(self, url: str) -> None:
+        """Open a keep-alive connection (DNS, TCP, TLS) to url's host before the first real request."""
+        if self.proxy_pool is not None:
+            return
+        try:
+            self.session.head(url, timeout=self.timeout, proxies=self.proxies, allow_redirects=False)
+        except requests.RequestException as e:
+            logger.debug("Warm-up of %s failed: %s", url, e)
+
+    def _session_for(self, proxy: Proxy) -> requests.Session:
+        session = self._proxy_sessions.get(proxy.url)
+        if session is None:
+            with self._sessions_lock:
+                session = self._proxy_sessions.get(proxy.url)
+                if session is None:
+                    session = self._proxy_sessions[proxy.url] = self._new_session()
+        return session
+
+    def _observe(self, url: str, resp: Response, rate_limiter: RateLimiter) -> None:
+        # urllib3 absorbs intermediate 429s while retrying; count them too so the
+        # limiter backs off even when a later attempt succeeded.
+        retries = getattr(resp.raw, "retries", None)
+        history = getattr(retries, "history", ()) or ()
+        if history:
+            REGISTRY.inc("http_retries_total", len(history), host=urlsplit(url).hostname)
+        for entry in history:
+            if entry.status == 429:
+                rate_limiter.observe(url, 429)
+            # Retries that ended in an exception have no status.
+            self.breaker.record(url, entry.status)
+        rate_limiter.observe(url, resp.status_code, resp.headers.get("Retry-After"))
+        self.breaker.record(url, resp.status_code, resp.headers.get("Retry-After"))
+
+    def _headers(self, headers: Optional[Dict[str, str]]) -> Dict[str, str]:
+        hdrs = {
+            "User-Agent": self.user_agent,
+            "Accept": headers.get("Accept", "*/*") if headers else "*/*",
+            "Accept-Language": "en-US,en;q=0.9",
+            "Cache-Control": "no-cache",
+            "Pragma": "no-cache",
+        }
+        if headers:
+            hdrs.update(headers)
+        return hdrs
+
+    def get(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        allow_redirects: bool = True,
+    ) -> Optional[Response]:
+        return self._get(url, self._headers(headers), allow_redirects)
+
+    def get_streamed(
+        self,
+        url: str,
+        consume: Callable[[str], bool],
+        headers: Optional[Dict[str, str]] = None,
+        allow_redirects: bool = True,
+        max_bytes: Optional[int] = None,
+    ) -> Optional[Response]:
+        """
+        GET that hands a 200 body to `consume` as decoded text while it
+        downloads, instead of buffering it in resp.text. Reading stops, and the
+        connection is closed, as soon as consume returns True or max_bytes of
+        (decompressed) body have been read. The returned response is closed
+        and has no body; None on a connection error, as with get().
+        """
+        hdrs = self._headers(headers)
+        # Everything urllib3 can decode here (gzip, deflate, plus br / zstd when
+        # their packages are installed), so each byte read covers more page.
+        hdrs.setdefault("Accept-Encoding", ACCEPT_ENCODING)
+        return self._get(url, hdrs, allow_redirects, consume=consume, max_bytes=max_bytes)
+
+    def _read_body(
+        self,
+        url: str,
+        resp: Response,
+        consume: Callable[[str], bool],
+        max_bytes: Optional[int],
+    ) -> None:
+        decoder = codecs.getincrementaldecoder(resp.encoding or "utf-8")(errors="replace")
+        read, outcome = 0, "complete"
+        for chunk in resp.iter_content(chunk_size=self.stream_chunk_size):
+            read += len(chunk)
+            if consume(decoder.decode(chunk)):
+                outcome = "early"
+                break
+            if max_bytes is not None and read >= max_bytes:
+                outcome = "capped"
+                logger.debug("GET %s: stopped reading at the %d byte cap", url, max_bytes)
+                break
+        else:
+            consume(decoder.decode(b"", final=True))
+        REGISTRY.inc("http_body_bytes_total", read, host=urlsplit(url).hostname)
+        REGISTRY.inc("http_streamed_total", outcome=outcome)
+
+    def _get(
+        self,
+        url: str,
+        hdrs: Dict[str, str],
+        allow_redirects: bool,
+        consume: Optional[Callable[[str], bool]] = None,
+        max_bytes: Optional[int] = None,
+    ) -> Optional[Response]:
+        # While the host's circuit is open, wait here rather than spend a request.
+        self.breaker.wait(url)
+        # With a pool, the chosen proxy's own budget replaces the shared one:
+        # upstream limits are per client IP.
+        proxy = self.proxy_pool.acquire() if self.proxy_pool else None
+        if proxy is not None:
+            session, proxies, rate_limiter = self._session_for(proxy), proxy.requests_proxies, proxy.rate_limiter
+        else:
+            session, proxies, rate_limiter = self.session, self.proxies, self.rate_limiter
+        rate_limiter.acquire(url)
 
-    def _sleep_jitter(self) -> None:
\ No newline at end of file
+        host = urlsplit(url).hostname
+        REGISTRY.inc("http_requests_total", host=host)
+        start = time.perf_counter()
+        status: Optional[int] = None
+        try:
+            resp = session.get(
+                url,
+                headers=hdrs,
+                timeout=self.timeout,
+                proxies=proxies,
+                allow_redirects=allow_redirects,
+                stream=consume is not None,
+            )
+            status = resp.status_code
+            if consume is not None:
+                # Closing before the body is fully read drops the connection
+                # rather than returning it to the pool; that is the point.
+                with resp:
+                    if resp.status_code == 200:
+                        self._read_body(url, resp, consume, max_bytes)
+            REGISTRY.observe("http_request_seconds", time.perf_counter() - start, host=host)
+            REGISTRY.inc("http_responses_total", status=resp.status_code)
+            logger.debug("GET %s -> %s", url, resp.status_code)
+            self._observe(url, resp, rate_limiter)
+            return resp
+        except requests.RequestException as e:
+            REGISTRY.observe("http_request_seconds", time.perf_counter() - start, host=host)
+            REGISTRY.inc("http_errors_total", host=host)
+            self.breaker.record(url, None)
+            logger.warning("GET %s failed: %s", url, e)
+            return None
+        finally:
+            if proxy is not None:
+                self.proxy_pool.release(proxy, status)
@@ -1,16 +1,29 @@
 import argparse
+import itertools
 import json
 import logging
 import os
 import sys
+import time
+from dataclasses import asdict
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 
 # Local imports
+from extractors.data_cleaner import InputStats, iter_clean_usernames
+from extractors.fetch_pool import fetch_profiles, fetch_profiles_on_loop
 from extractors.instagram_parser import InstagramParser
-from outputs.exporter_json import export_json
-from outputs.exporter_csv import export_csv
+from extractors.metrics import REGISTRY
+from extractors.outcomes import OK, FetchResult
+from extractors.profile_cache import ProfileCache
+from extractors.profile_record import ProfileRecord
+from extractors.scheduler import RefreshScheduler
+from extractors.sharding import iter_shard, parse_shard
+from outputs.writers import MultiWriter, available_formats, merge_parts, open_writer, writer_suffix
+from outputs.checkpoint import CheckpointJournal
+from outputs.history_store import HistoryStore
+from outputs.shard_merge import existing_parts, part_path
 
 ROOT = Path(__file__).resolve().parents[1]
 DATA_DIR = ROOT / "data"
@@ -31,31 +44,46 @@ def configure_logging(verbosity: int) -> None:
         datefmt="%H:%M:%S",
     )
 
-def load_usernames(path: Path) -> List[str]:
+def load_usernames(path: Path, stats: Optional[InputStats] = None) -> Iterator[str]:
+    """
+    Stream normalized, de-duplicated usernames from `path` one line at a time,
+    so arbitrarily large input files are never held in memory.
+    """
     if not path.exists():
         logging.warning("Usernames file %s does not exist. Falling back to sample list.", path)
-        return ["instagram", "natgeo", "nike"]
-    usernames = []
+        yield from iter_clean_usernames(["instagram", "natgeo", "nike"], stats)
+        return
     with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-            usernames.append(line)
-    return usernames
-
-def ensure_config(path: Path) -> Dict[str, Any]:
+        yield from iter_clean_usernames(f, stats)
+
+def merge_config(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
+    """`override` laid over `base`: nested sections merge key by key, anything else replaces."""
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_config(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+def ensure_config(path: Optional[Path] = None) -> Dict[str, Any]:
     """
-    Loads configuration. If a custom settings.json is not found next to example,
-    it will use the example as defaults.
+    Loads configuration. The example file provides defaults; settings in
+    `path` (default: a custom settings.json next to it) override them, so a
+    partial section such as {"request": {"timeout_seconds": 30}} keeps the
+    other defaults of that section.
     """
     example = CONFIG_EXAMPLE
-    candidate = example.with_name("settings.json")
-    src = candidate if candidate.exists() else example
+    candidate = path if path is not None and path != example else example.with_name("settings.json")
     try:
-        with src.open("r", encoding="utf-8") as f:
+        with example.open("r", encoding="utf-8") as f:
             cfg = json.load(f)
-        logging.info("Loaded config from %s", src)
+        if candidate.exists():
+            with candidate.open("r", encoding="utf-8") as f:
+                cfg = merge_config(cfg, json.load(f))
+            logging.info("Loaded config from %s over %s", candidate, example)
+        else:
+            logging.info("Loaded config from %s", example)
         return cfg
     except Exception as e:
         logging.warning("Failed to load config (%s). Using safe defaults.", e)
@@ -66,11 +94,17 @@ def ensure_config(path: Path) -> Dict[str, Any]:
                 "concurrency": 5,
                 "proxies": None,
                 "user_agent": None,
-                "delay_ms_min": 250,
-                "delay_ms_max": 750
+                "rate_limit": {"rate_per_second": 2.0, "burst": 5},
+                "cache": {"enabled": False}
             }
         }
 
+def _shard_spec(value: str) -> Tuple[int, int]:
+    try:
+        return parse_shard(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
 def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     p = argparse.ArgumentParser(
         description="Instagram Followers Count Scraper - public profile metrics collector"
@@ -93,11 +127,154 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
         default=DEFAULT_OUTPUT_CSV,
         help=f"Path to write CSV results. Default: {DEFAULT_OUTPUT_CSV}"
     )
+    p.add_argument(
+        "--out-parquet",
+        type=Path,
+        default=None,
+        help="Path of the Parquet output (implies --format parquet). Default: <out-json>.parquet"
+    )
+    p.add_argument(
+        "--out-arrow",
+        type=Path,
+        default=None,
+        help="Path of the Arrow IPC output (implies --format arrow). Default: <out-json>.arrow"
+    )
+    p.add_argument(
+        "--format",
+        dest="formats",
+        default="json,csv",
+        help=f"Comma-separated output formats, all written in one pass: {','.join(available_formats())}. "
+             "Default: json,csv. Formats without their own path option go next to --out-json."
+    )
+    p.add_argument(
+        "--json-format",
+        choices=("array", "ndjson"),
+        default="array",
+        help="Write the JSON output as one array (default) or as newline-delimited JSON."
+    )
+    p.add_argument(
+        "--config",
+        type=Path,
+        default=None,
+        help="Settings file layered over settings.example.json. Default: src/config/settings.json if present."
+    )
     p.add_argument(
         "--no-network",
         action="store_true",
         help="Do not call Instagram; instead, load data from existing JSON if present or return mock results."
     )
+    p.add_argument(
+        "-j", "--concurrency",
+        type=int,
+        default=None,
+        help="Number of profiles to fetch in parallel. Default: request.concurrency from config."
+    )
+    p.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Fetch on a single asyncio event loop instead of a thread pool (suits very high concurrency)."
+    )
+    p.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore the on-disk profile cache and fetch every profile live."
+    )
+    p.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=None,
+        help="Maximum age in seconds of a cached profile. Default: request.cache.ttl_seconds from config."
+    )
+    p.add_argument(
+        "--checkpoint",
+        type=Path,
+        default=None,
+        help="Path of the checkpoint journal. Default: <out-json>.checkpoint.ndjson"
+    )
+    p.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip usernames already completed in the checkpoint journal and merge their records into the output."
+    )
+    p.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Refresh mode: fetch only accounts that are due per the history store and schedule tiers "
+             "(stale, changing fast, not backing off after failures), most overdue first, and write "
+             "only profiles whose counts changed."
+    )
+    p.add_argument(
+        "--refresh-max-age",
+        type=float,
+        default=None,
+        help="Freshness SLA in seconds for accounts outside any schedule tier. "
+             "Default: history.max_age_seconds from config."
+    )
+    p.add_argument(
+        "--budget", "--refresh-limit",
+        dest="budget",
+        type=int,
+        default=None,
+        help="Account budget: fetch at most this many accounts in refresh mode."
+    )
+    p.add_argument(
+        "--history",
+        type=Path,
+        default=None,
+        help="Record follower history in this database (off unless history.enabled is set in config). "
+             "Default: history.path from config."
+    )
+    p.add_argument(
+        "--serve",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="ADDR",
+        help="Run as a long-lived lookup service instead of a batch: PORT, HOST:PORT or unix:PATH. "
+             "Default address: service.host/service.port from config. Input and output options are ignored."
+    )
+    p.add_argument(
+        "--shard",
+        type=_shard_spec,
+        default=None,
+        metavar="I/N",
+        help="Process only shard I of N (0-based) of the usernames, split by a consistent hash, and write "
+             "every output, checkpoint and metrics file as <name>.part-III-of-NNN<ext>. Run one per "
+             "machine, then combine with --merge N."
+    )
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Run this many shard processes on this machine and merge their outputs. Concurrency, "
+             "rate limits and --budget apply per worker."
+    )
+    p.add_argument(
+        "--merge",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Do not fetch; merge the N shard parts of each output (from --shard runs) into the output paths."
+    )
+    p.add_argument(
+        "--metrics-json",
+        type=Path,
+        default=None,
+        help="Where to write the end-of-run metrics summary. Default: <out-json>.metrics.json"
+    )
+    p.add_argument(
+        "--metrics-prom",
+        type=Path,
+        default=None,
+        help="Also write metrics in Prometheus text format to this file at the end of the run."
+    )
+    p.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="Serve live Prometheus metrics on http://127.0.0.1:PORT/metrics while running."
+    )
     p.add_argument(
         "-v", "--verbose",
         action="count",
@@ -106,77 +283,424 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     )
     return p.parse_args(argv)
 
+def offline_records(cached_json: Path, usernames: Iterable[str], ts: str) -> List[ProfileRecord]:
+    """
+    Records for --no-network mode: the previous JSON output if present, else
+    mock rows so the pipeline runs end-to-end. Read fully up front because the
+    same file is about to be overwritten.
+    """
+    logger = logging.getLogger("main")
+    if cached_json.exists():
+        try:
+            with cached_json.open("r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if isinstance(cached, list) and cached:
+                logger.info("Loaded %d cached records from %s", len(cached), cached_json)
+                return [ProfileRecord.from_mapping(r) for r in cached if isinstance(r, dict)]
+        except Exception as e:
+            logger.warning("Failed to read cached JSON (%s). Using mock data.", e)
+
+    results = []
+    for u in usernames:
+        results.append(ProfileRecord(
+            username=u,
+            full_name=u.capitalize(),
+            followers_count=12345,
+            following_count=150,
+            bio=f"Mock bio for {u}",
+            posts_count=50,
+            engagement_rate=2.1,
+            is_verified=False,
+            profile_image=f"https://instagram.com/{u}/profile.jpg",
+            fetched_at=ts,
+            source="mock",
+        ))
+    logger.info("Generated %d mock records (no-network mode).", len(results))
+    return results
+
+def live_records(
+    parser: InstagramParser,
+    usernames: Iterable[str],
+    concurrency: int,
+    use_async: bool,
+    ts: str,
+    journal: Optional[CheckpointJournal] = None,
+    done: Optional[Dict[str, ProfileRecord]] = None,
+    history: Optional[HistoryStore] = None,
+) -> Iterator[ProfileRecord]:
+    """
+    Fetch profiles and yield them in input order as soon as each is ready.
+    Usernames found in `done` (from a resumed checkpoint) are answered from
+    there without a request; every new outcome is appended to `journal`.
+    Failures are also noted in `history` so the scheduler backs off.
+    """
+    logger = logging.getLogger("main")
+    done = done or {}
+
+    def fetch(username: str) -> FetchResult:
+        prior = done.get(username)
+        return FetchResult(prior.copy(), OK) if prior is not None else parser.fetch(username)
+
+    async def fetch_async(username: str) -> FetchResult:
+        prior = done.get(username)
+        return FetchResult(prior.copy(), OK) if prior is not None else await parser.fetch_async(username)
+
+    if use_async:
+        fetched = fetch_profiles_on_loop(fetch_async, usernames, concurrency, on_close=parser.aclose)
+    else:
+        fetched = fetch_profiles(fetch, usernames, concurrency)
+    for username, (profile, outcome) in fetched:
+        if username in done:
+            yield profile
+            continue
+        if not profile:
+            logger.warning("Could not fetch profile for '%s' (%s). Skipping.", username, outcome)
+            if journal is not None:
+                journal.record_failed(username, outcome)
+            if history is not None:
+                history.record_failure(username)
+            continue
+        # Cache hits carry their original fetch time and source.
+        profile.setdefault("fetched_at", ts)
+        profile.setdefault("source", "live")
+        if journal is not None:
+            journal.record_ok(username, profile)
+        yield profile
+
+def output_targets(args: argparse.Namespace) -> List[Tuple[str, Path]]:
+    """(format, path) for every requested output, in --format order."""
+    formats = [f.strip().lower() for f in args.formats.split(",") if f.strip()]
+    explicit = {"json": args.out_json, "csv": args.out_csv, "parquet": args.out_parquet, "arrow": args.out_arrow}
+    for fmt in ("parquet", "arrow"):
+        if explicit[fmt] is not None and fmt not in formats:
+            formats.append(fmt)
+    unknown = [f for f in formats if f not in available_formats()]
+    if unknown:
+        raise SystemExit(f"Unsupported output format(s): {', '.join(unknown)}")
+    targets = []
+    for fmt in dict.fromkeys(formats):
+        path = explicit.get(fmt) or args.out_json.with_suffix(writer_suffix(fmt))
+        targets.append((fmt, path))
+    return targets
+
+def write_run_metrics(
+    args: argparse.Namespace,
+    parser: InstagramParser,
+    input_stats: InputStats,
+    written: int,
+    elapsed: float,
+) -> None:
+    REGISTRY.set_gauge("run_seconds", round(elapsed, 3))
+    REGISTRY.set_gauge("profiles_per_second", round(written / elapsed, 3) if elapsed > 0 else 0.0)
+    extra = {
+        "profiles_written": written,
+        "profiles_per_second": round(written / elapsed, 3) if elapsed > 0 else 0.0,
+        "input": asdict(input_stats),
+        "strategies": parser.strategy_stats(),
+    }
+    if parser.proxy_pool is not None:
+        extra["proxies"] = parser.proxy_pool.snapshot()
+    circuits = parser.breaker.snapshot()
+    if circuits:
+        extra["circuits"] = circuits
+    REGISTRY.write_json(args.metrics_json or args.out_json.with_suffix(".metrics.json"), extra)
+    if args.metrics_prom:
+        REGISTRY.write_prometheus(args.metrics_prom)
+
+def shard_paths(args: argparse.Namespace, index: int, shards: int) -> None:
+    """Point every file a run writes at this shard's part, so shards never share one."""
+    for name in ("out_json", "out_csv", "out_parquet", "out_arrow", "checkpoint", "metrics_json", "metrics_prom"):
+        path = getattr(args, name)
+        if path is not None:
+            setattr(args, name, part_path(path, index, shards))
+
+def merge_shards(targets: List[Tuple[str, Path]], shards: int, json_format: str) -> List[Path]:
+    """Merge the shard parts of every output; returns the parts that were merged."""
+    merged: List[Path] = []
+    for fmt, path in targets:
+        parts = existing_parts(path, shards)
+        if not parts:
+            continue
+        path.parent.mkdir(parents=True, exist_ok=True)
+        merge_parts(fmt, parts, path, json_format=json_format)
+        logging.getLogger("main").info("Merged %d %s parts into %s", len(parts), fmt, path)
+        merged.extend(parts)
+    return merged
+
+def shard_written(args: argparse.Namespace, shards: int) -> Optional[int]:
+    """Records written by all shards, from their metrics files; None if any is missing."""
+    total = 0
+    for index in range(shards):
+        if args.metrics_json is not None:
+            metrics = part_path(args.metrics_json, index, shards)
+        else:
+            metrics = part_path(args.out_json, index, shards).with_suffix(".metrics.json")
+        try:
+            with metrics.open("r", encoding="utf-8") as f:
+                total += int(json.load(f)["profiles_written"])
+        except (OSError, ValueError, KeyError):
+            return None
+    return total
+
+def print_targets(targets: List[Tuple[str, Path]]) -> None:
+    width = max(len(fmt) for fmt, _ in targets) + 2
+    for fmt, path in targets:
+        print(f"{fmt.upper() + ':':<{width}}{path}")
+
+def run_workers(args: argparse.Namespace, argv: List[str]) -> int:
+    """
+    Run `args.workers` copies of this script, each on its own --shard of the
+    input and with its own GIL, then merge their outputs and remove the parts.
+    A failed worker keeps its checkpoint; rerun it with --shard I/N --resume
+    and then --merge N.
+    """
+    import subprocess
+
+    logger = logging.getLogger("main")
+    shards = args.workers
+    targets = output_targets(args)
+    script = str(Path(__file__).resolve())
+    procs = []
+    for index in range(shards):
+        # argparse keeps the last occurrence of a flag, so these override argv.
+        extra = ["--workers", "1", "--shard", f"{index}/{shards}"]
+        if args.metrics_port is not None:
+            extra += ["--metrics-port", str(args.metrics_port + index)]
+        # Workers log to our stderr; their per-shard summaries are replaced by ours.
+        procs.append(subprocess.Popen([sys.executable, script, *argv, *extra], stdout=subprocess.DEVNULL))
+    logger.info("Started %d shard workers", shards)
+    try:
+        codes = [proc.wait() for proc in procs]
+    except KeyboardInterrupt:
+        # The workers received the same SIGINT; let them close their checkpoints.
+        for proc in procs:
+            proc.wait()
+        raise
+
+    merged = merge_shards(targets, shards, args.json_format)
+    failed = [index for index, code in enumerate(codes) if code != 0]
+    if failed:
+        logger.error(
+            "Shards %s failed; their parts were kept. Rerun each with --shard I/%d --resume, then --merge %d.",
+            ", ".join(map(str, failed)), shards, shards,
+        )
+        return 1
+    for part in merged:
+        part.unlink()
+    if not merged:
+        print(f"No shard produced output ({shards} workers)")
+        return 0
+    written = shard_written(args, shards)
+    print(f"✅ Merged {shards} shards" + (f": {written} records" if written is not None else ""))
+    print_targets(targets)
+    return 0
+
+def run_service(args: argparse.Namespace) -> int:
+    """Keep one parser, its connections and caches alive and answer lookups over HTTP."""
+    from service import ProfileService, parse_address, serve
+
+    logger = logging.getLogger("main")
+    if args.metrics_port is not None:
+        REGISTRY.serve(args.metrics_port)
+    cfg = ensure_config(args.config)
+    service_cfg = dict(cfg.get("service") or {})
+    try:
+        address = parse_address(
+            args.serve, service_cfg.get("host", "127.0.0.1"), int(service_cfg.get("port", 8766))
+        )
+    except ValueError as e:
+        raise SystemExit(str(e)) from None
+
+    request_cfg = dict(cfg.get("request", {}))
+    if args.concurrency is not None:
+        request_cfg["concurrency"] = args.concurrency
+    cache_cfg = dict(request_cfg.get("cache") or {})
+    if args.cache_ttl is not None:
+        cache_cfg["ttl_seconds"] = args.cache_ttl
+    cache = None if args.no_cache else ProfileCache.from_config(cache_cfg, ROOT)
+    parser = InstagramParser(config=request_cfg, cache=cache)
+
+    service = ProfileService(
+        parser,
+        concurrency=max(1, int(request_cfg.get("concurrency", 1))),
+        ttl_seconds=float(cache_cfg.get("ttl_seconds", 86400)),
+        max_entries=int(service_cfg.get("memory_entries", 100_000)),
+        timeout_seconds=float(service_cfg.get("request_timeout_seconds", 30)),
+    )
+    if service_cfg.get("warm_up", True):
+        service.warm()
+    try:
+        serve(service, address, max_batch=int(service_cfg.get("max_batch", 500)))
+    finally:
+        if cache is not None:
+            logger.info("Profile cache: %d hits, %d misses", cache.hits, cache.misses)
+            cache.close()
+    return 0
+
 def main(argv: Optional[List[str]] = None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
     args = parse_args(argv)
     configure_logging(args.verbose)
     logger = logging.getLogger("main")
 
-    cfg = ensure_config(CONFIG_EXAMPLE)
-    usernames = load_usernames(args.input)
-    if not usernames:
+    if args.workers > 1 and (args.shard is not None or args.merge is not None):
+        raise SystemExit("--workers cannot be combined with --shard or --merge")
+    if args.merge is not None:
+        targets = output_targets(args)
+        if not merge_shards(targets, args.merge, args.json_format):
+            logger.error("No shard parts found to merge.")
+            return 1
+        written = shard_written(args, args.merge)
+        print(f"✅ Merged {args.merge} shards" + (f": {written} records" if written is not None else ""))
+        print_targets(targets)
+        return 0
+    if args.workers > 1:
+        return run_workers(args, argv)
+    if args.serve is not None:
+        return run_service(args)
+    if args.shard is not None:
+        shard_paths(args, *args.shard)
+
+    run_started = time.perf_counter()
+    if args.metrics_port is not None:
+        REGISTRY.serve(args.metrics_port)
+
+    cfg = ensure_config(args.config)
+    targets = output_targets(args)
+    input_stats = InputStats()
+    username_iter = load_usernames(args.input, input_stats)
+    if args.shard is not None:
+        username_iter = iter_shard(username_iter, *args.shard)
+    first = next(username_iter, None)
+    if first is None and input_stats.kept:
+        logger.info("Shard %d/%d has no usernames.", *args.shard)
+        return 0
+    if first is None:
         logger.error("No usernames provided. Exiting.")
         return 2
+    usernames = itertools.chain([first], username_iter)
+
+    request_cfg = dict(cfg.get("request", {}))
+    if args.concurrency is not None:
+        request_cfg["concurrency"] = args.concurrency
+    concurrency = max(1, int(request_cfg.get("concurrency", 1)))
+
+    cache = None
+    if not args.no_cache and not args.no_network:
+        cache_cfg = dict(request_cfg.get("cache") or {})
+        if args.cache_ttl is not None:
+            cache_cfg["ttl_seconds"] = args.cache_ttl
+        cache = ProfileCache.from_config(cache_cfg, ROOT)
+    history = None
+    if not args.no_network:
+        history_cfg = dict(cfg.get("history") or {})
+        if args.history is not None:
+            history_cfg.update(enabled=True, path=str(args.history))
+        if args.refresh:
+            history_cfg["enabled"] = True
+        if args.shard is not None and args.shard[1] > 1:
+            # Other shards write to the same database; don't hold its lock across fetches.
+            history_cfg["commit_every"] = 1
+        history = HistoryStore.from_config(history_cfg, ROOT)
 
-    parser = InstagramParser(config=cfg.get("request", {}))
+    if args.refresh and history is not None:
+        max_age = (
+            args.refresh_max_age if args.refresh_max_age is not None
+            else float(history_cfg.get("max_age_seconds", 86400))
+        )
+        scheduler = RefreshScheduler.from_config(cfg.get("schedule"), ROOT, max_age)
+        names = list(usernames)
+        planned = scheduler.plan(names, history.states(names), args.budget)
+        first = next(planned, None)
+        stats = scheduler.stats
+        logger.info(
+            "Refresh: %d candidates, %d due, %d fresh, %d backing off after failures; budget %s",
+            stats.candidates, stats.due, stats.fresh, stats.backing_off,
+            args.budget if args.budget is not None else "unlimited",
+        )
+        REGISTRY.set_gauge("refresh_due", stats.due)
+        if first is None:
+            history.close()
+            if cache is not None:
+                cache.close()
+            print(f"Nothing to refresh: {stats.fresh} accounts fresh, {stats.backing_off} backing off")
+            return 0
+        usernames = itertools.chain([first], planned)
+    # Refresh must see current counts, so the profile cache is not read; what
+    # it fetches is still written back so later runs don't serve older profiles.
+    parser = InstagramParser(config=request_cfg, cache=cache, read_cache=not args.refresh)
 
-    results: List[Dict[str, Any]] = []
     ts = datetime.utcnow().isoformat() + "Z"
 
+    journal = None
     if args.no_network:
-        # Try to load cached output; else build mock results so the pipeline runs end-to-end.
-        if args.out_json.exists():
-            try:
-                with args.out_json.open("r", encoding="utf-8") as f:
-                    cached = json.load(f)
-                    if isinstance(cached, list):
-                        results = cached
-                        logger.info("Loaded %d cached records from %s", len(results), args.out_json)
-            except Exception as e:
-                logger.warning("Failed to read cached JSON (%s). Using mock data.", e)
-
-        if not results:
-            for u in usernames:
-                results.append({
-                    "username": u,
-                    "full_name": u.capitalize(),
-                    "followers_count": 12345,
-                    "following_count": 150,
-                    "bio": f"Mock bio for {u}",
-                    "profile_url": f"https://www.instagram.com/{u}/",
-                    "posts_count": 50,
-                    "engagement_rate": 2.1,
-                    "is_verified": False,
-                    "profile_image": f"https://instagram.com/{u}/profile.jpg",
-                    "fetched_at": ts,
-                    "source": "mock"
-                })
-            logger.info("Generated %d mock records (no-network mode).", len(results))
+        records: Iterable[ProfileRecord] = offline_records(args.out_json, usernames, ts)
     else:
-        for username in usernames:
-            try:
-                profile = parser.fetch_profile(username)
-                if not profile:
-                    logger.warning("Could not fetch profile for '%s'. Skipping.", username)
+        journal = CheckpointJournal(args.checkpoint or args.out_json.with_suffix(".checkpoint.ndjson"))
+        done: Dict[str, ProfileRecord] = {}
+        if args.resume:
+            # Failed handles are retried; only completed ones are skipped.
+            done, _ = journal.load()
+        journal.open(resume=args.resume)
+        logger.info(
+            "Fetching profiles with concurrency=%d (%s), %d already done",
+            concurrency, "asyncio" if args.use_async else "threads", len(done),
+        )
+        records = live_records(parser, usernames, concurrency, args.use_async, ts, journal, done, history)
+
+    # Ensure output directories exist
+    for _, path in targets:
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Records are written as they arrive, to every format in the same pass;
+    # nothing is held for the whole batch.
+    written = 0
+    unchanged = 0
+    try:
+        sinks = MultiWriter([
+            (fmt, open_writer(fmt, path, json_format=args.json_format)) for fmt, path in targets
+        ])
+        if args.refresh:
+            # A refresh writes only the changed accounts. Truncate every
+            # output even when nothing changed, so an older full snapshot at
+            # the same path is never mistaken for this run's delta.
+            sinks.open()
+        with sinks:
+            for record in records:
+                if history is not None and not history.record(record) and args.refresh:
+                    unchanged += 1
                     continue
-                profile["fetched_at"] = ts
-                profile["source"] = "live"
-                results.append(profile)
-            except Exception as e:
-                logger.exception("Error processing '%s': %s", username, e)
+                sinks.write(record)
+                REGISTRY.inc("profiles_total", source=record.get("source"))
+            written = sinks.count
+    finally:
+        write_run_metrics(args, parser, input_stats, written, time.perf_counter() - run_started)
+        if not args.no_network:
+            for name, counters in parser.strategy_stats().items():
+                logger.info("Strategy %s: %s", name, counters)
+        if journal is not None:
+            journal.close()
+        if cache is not None:
+            logger.info("Profile cache: %d hits, %d misses", cache.hits, cache.misses)
+            cache.close()
+        if history is not None:
+            history.close()
 
-    if not results:
+    logger.info(
+        "Input: %d lines, %d unique usernames, dropped %d duplicates and %d invalid",
+        input_stats.lines, input_stats.kept, input_stats.duplicates, input_stats.invalid,
+    )
+    if not written and not unchanged:
         logger.error("No results were produced. Exiting with failure.")
         return 1
 
-    # Ensure output directory exists
-    args.out_json.parent.mkdir(parents=True, exist_ok=True)
-    args.out_csv.parent.mkdir(parents=True, exist_ok=True)
-
-    export_json(results, args.out_json)
-    export_csv(results, args.out_csv)
-
-    logger.info("Done. JSON -> %s, CSV -> %s", args.out_json, args.out_csv)
-    print(f"✅ Wrote {len(results)} records\nJSON: {args.out_json}\nCSV:  {args.out_csv}")
+    logger.info("Done. %s", ", ".join(f"{fmt.upper()} -> {path}" for fmt, path in targets))
+    print(f"✅ Wrote {written} records")
+    print_targets(targets)
+    if unchanged:
+        print(f"{unchanged} refreshed accounts were unchanged and not written")
+    if input_stats.dropped:
+        print(f"Skipped {input_stats.duplicates} duplicate and {input_stats.invalid} invalid usernames")
     return 0
 
 if __name__ == "__main__":
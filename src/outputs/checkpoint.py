@@ -0,0 +1,90 @@
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, IO, Mapping, Optional, Set, Tuple
+
+from extractors.profile_record import ProfileRecord, as_dict
+
+logger = logging.getLogger(__name__)
+
+class CheckpointJournal:
+    """
+    Append-only NDJSON log of finished lookups, one line per username:
+
+        {"username": "natgeo", "status": "ok", "record": {...}}
+        {"username": "ghost", "status": "failed"}
+
+    Each line is flushed as it is written, so a killed run keeps everything it
+    completed. load() replays the log; a later line for the same username wins.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._f: Optional[IO[str]] = None
+
+    def load(self) -> Tuple[Dict[str, ProfileRecord], Set[str]]:
+        """
+        Replay the journal into ({username: record}, failed usernames). Records
+        come back as ProfileRecords, so resuming a large run stays compact.
+        """
+        done: Dict[str, ProfileRecord] = {}
+        failed: Set[str] = set()
+        if not self.path.exists():
+            return done, failed
+        with self.path.open("r", encoding="utf-8") as f:
+            for lineno, line in enumerate(f, 1):
+                try:
+                    entry = json.loads(line)
+                    username = entry["username"]
+                except (ValueError, KeyError, TypeError):
+                    # A torn final line from a killed run is expected; skip it.
+                    logger.debug("Ignoring unreadable checkpoint line %d in %s", lineno, self.path)
+                    continue
+                if entry.get("status") == "ok" and isinstance(entry.get("record"), dict):
+                    done[username] = ProfileRecord.from_mapping(entry["record"])
+                    failed.discard(username)
+                else:
+                    failed.add(username)
+                    done.pop(username, None)
+        logger.info("Checkpoint %s: %d done, %d failed", self.path, len(done), len(failed))
+        return done, failed
+
+    def open(self, resume: bool) -> "CheckpointJournal":
+        """Open for appending (resume) or start a fresh journal."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        torn = False
+        if resume and self.path.exists() and self.path.stat().st_size:
+            with self.path.open("rb") as f:
+                f.seek(-1, 2)
+                torn = f.read(1) != b"\n"
+        self._f = self.path.open("a" if resume else "w", encoding="utf-8")
+        if torn:
+            # Terminate a half-written last line so new entries start cleanly.
+            self._f.write("\n")
+        return self
+
+    def __enter__(self) -> "CheckpointJournal":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        if self._f is None:
+            raise RuntimeError("Checkpoint journal is not open")
+        self._f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._f.flush()
+
+    def record_ok(self, username: str, record: Mapping[str, Any]) -> None:
+        self._append({"username": username, "status": "ok", "record": as_dict(record)})
+
+    def record_failed(self, username: str, outcome: Optional[str] = None) -> None:
+        entry = {"username": username, "status": "failed"}
+        if outcome:
+            entry["outcome"] = outcome
+        self._append(entry)
+
+    def close(self) -> None:
+        if self._f is not None:
+            self._f.close()
+            self._f = None
@@ -0,0 +1,185 @@
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from extractors.data_cleaner import canonical_fields
+
+logger = logging.getLogger(__name__)
+
+def _to_int(value: Any) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _to_float(value: Any) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _to_bool(value: Any) -> Optional[bool]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes")
+    return bool(value)
+
+def _to_str(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+def _to_timestamp(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    try:
+        dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+# Column name, Arrow type name, converter. Same columns and order as CSV_FIELDS.
+COLUMNS: List[Tuple[str, str, Callable[[Any], Any]]] = [
+    ("username", "string", _to_str),
+    ("full_name", "string", _to_str),
+    ("followers_count", "int64", _to_int),
+    ("following_count", "int64", _to_int),
+    ("bio", "string", _to_str),
+    ("profile_url", "string", _to_str),
+    ("posts_count", "int64", _to_int),
+    ("engagement_rate", "float64", _to_float),
+    ("is_verified", "bool", _to_bool),
+    ("profile_image", "string", _to_str),
+    ("fetched_at", "timestamp", _to_timestamp),
+    ("source", "string", _to_str),
+]
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise RuntimeError("Parquet/Arrow output needs pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+def profile_schema():
+    pa = _pyarrow()
+    types = {
+        "string": pa.string(),
+        "int64": pa.int64(),
+        "float64": pa.float64(),
+        "bool": pa.bool_(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+    }
+    return pa.schema([pa.field(name, types[kind]) for name, kind, _ in COLUMNS])
+
+class ArrowStreamWriter:
+    """
+    Writes records to Parquet or Arrow IPC (feather v2) with a typed schema:
+    int64 counts, bool is_verified, UTC timestamp fetched_at. Rows are buffered
+    column-wise and written as one row group / record batch every `batch_size`
+    records, so memory is bounded by the batch, not the run. Like the other
+    stream writers the file is created on the first write.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        fmt: str = "parquet",
+        batch_size: int = 65536,
+        compression: Optional[str] = "zstd",
+    ) -> None:
+        if fmt not in ("parquet", "arrow"):
+            raise ValueError(f"Unsupported columnar format: {fmt}")
+        self.path = Path(path)
+        self.fmt = fmt
+        self.batch_size = max(1, int(batch_size))
+        self.compression = compression
+        self.count = 0
+        self._schema = None
+        self._writer = None
+        self._columns: Dict[str, List[Any]] = {name: [] for name, _, _ in COLUMNS}
+        self._buffered = 0
+
+    def __enter__(self) -> "ArrowStreamWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def open(self) -> None:
+        """Create the file now; otherwise that happens on the first write."""
+        if self._writer is not None:
+            return
+        self._schema = profile_schema()
+        if self.fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            self._writer = pq.ParquetWriter(str(self.path), self._schema, compression=self.compression)
+        else:
+            import pyarrow as pa
+
+            options = pa.ipc.IpcWriteOptions(compression=self.compression) if self.compression else None
+            self._writer = pa.ipc.new_file(str(self.path), self._schema, options=options)
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self.open()
+        record = canonical_fields(record)
+        for name, _, convert in COLUMNS:
+            self._columns[name].append(convert(record.get(name)))
+        self._buffered += 1
+        self.count += 1
+        if self._buffered >= self.batch_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._buffered:
+            return
+        pa = _pyarrow()
+        batch = pa.RecordBatch.from_arrays(
+            [pa.array(self._columns[field.name], type=field.type) for field in self._schema],
+            schema=self._schema,
+        )
+        # One row group (Parquet) or record batch (IPC) per flush.
+        self._writer.write_batch(batch)
+        for values in self._columns.values():
+            values.clear()
+        self._buffered = 0
+
+    def close(self) -> None:
+        if self._writer is None:
+            return
+        try:
+            self._flush()
+        finally:
+            self._writer.close()
+            self._writer = None
+        logger.info("Wrote %s to %s (%d records)", self.fmt.capitalize(), self.path, self.count)
+
+def merge_columnar_parts(parts: Sequence[Path], path: Path, fmt: str = "parquet") -> None:
+    """
+    Concatenate Parquet or Arrow IPC parts batch by batch, so at most one row
+    group / record batch is in memory and no value goes through Python.
+    """
+    pa = _pyarrow()
+    schema = profile_schema()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        with pq.ParquetWriter(str(path), schema, compression="zstd") as writer:
+            for part in parts:
+                source = pq.ParquetFile(str(part))
+                for i in range(source.num_row_groups):
+                    writer.write_table(source.read_row_group(i).cast(schema))
+    else:
+        with pa.ipc.new_file(str(path), schema, options=pa.ipc.IpcWriteOptions(compression="zstd")) as writer:
+            for part in parts:
+                with pa.memory_map(str(part)) as f:
+                    source = pa.ipc.open_file(f)
+                    for i in range(source.num_record_batches):
+                        writer.write_batch(source.get_batch(i))
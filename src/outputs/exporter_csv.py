@@ -1,7 +1,9 @@
 import csv
 import logging
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, IO, List, Optional
+
+from extractors.data_cleaner import canonical_fields
 
 logger = logging.getLogger(__name__)
 
@@ -30,4 +32,47 @@ def export_csv(records: List[Dict[str, Any]], path: Path) -> None:
         logger.info("Wrote CSV to %s (%d records)", path, len(records))
     except Exception as e:
         logger.error("Failed to write CSV to %s: %s", path, e)
-        raise
\ No newline at end of file
+        raise
+
+class CsvStreamWriter:
+    """
+    Incremental counterpart of export_csv: rows are written as they arrive and
+    flushed every `flush_every` records. The file (and header) is created on the
+    first write, so an empty run leaves no file behind.
+    """
+
+    def __init__(self, path: Path, flush_every: int = 100) -> None:
+        self.path = Path(path)
+        self.flush_every = max(1, int(flush_every))
+        self.count = 0
+        self._f: Optional[IO[str]] = None
+        self._writer: Optional["csv.DictWriter[str]"] = None
+
+    def __enter__(self) -> "CsvStreamWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def open(self) -> "csv.DictWriter[str]":
+        """Create the file and header now; otherwise that happens on the first write."""
+        if self._writer is None:
+            self._f = self.path.open("w", encoding="utf-8", newline="")
+            self._writer = csv.DictWriter(self._f, fieldnames=CSV_FIELDS, extrasaction="ignore")
+            self._writer.writeheader()
+        return self._writer
+
+    def write(self, record: Dict[str, Any]) -> None:
+        record = canonical_fields(record)
+        self.open().writerow({k: record.get(k) for k in CSV_FIELDS})
+        self.count += 1
+        if self.count % self.flush_every == 0:
+            self._f.flush()
+
+    def close(self) -> None:
+        if self._f is None:
+            return
+        self._f.close()
+        self._f = None
+        self._writer = None
+        logger.info("Wrote CSV to %s (%d records)", self.path, self.count)
@@ -0,0 +1,111 @@
+import logging
+from datetime import datetime
+from html import escape
+from pathlib import Path
+from typing import Any, Dict, IO, List, Optional
+
+from extractors.data_cleaner import canonical_fields
+
+logger = logging.getLogger(__name__)
+
+HTML_FIELDS = [
+    "username",
+    "full_name",
+    "followers_count",
+    "following_count",
+    "posts_count",
+    "profile_url",
+    "fetched_at",
+]
+
+_HEAD = """<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <title>Instagram Followers Count Export</title>
+  <style>
+    body {{
+      font-family: Arial, sans-serif;
+      padding: 16px;
+    }}
+    table {{
+      border-collapse: collapse;
+      width: 100%;
+      max-width: 960px;
+    }}
+    th, td {{
+      text-align: left;
+    }}
+    th {{
+      background-color: #f4f4f4;
+    }}
+  </style>
+</head>
+<body>
+  <h1>Instagram Followers Count Export</h1>
+  <p>Generated at {generated}Z</p>
+  <table border='1' cellspacing='0' cellpadding='6'>
+  <thead>
+    <tr>{header}</tr>
+  </thead>
+  <tbody>
+"""
+
+_TAIL = """  </tbody>
+</table>
+</body>
+</html>
+"""
+
+class HtmlStreamWriter:
+    """
+    Streams an HTML table: the page head is written on the first record, one
+    <tr> per record after it and the closing tags on close(), so no string
+    for the whole table is ever built. Values are HTML-escaped.
+    """
+
+    def __init__(self, path: Path, fields: Optional[List[str]] = None, flush_every: int = 100) -> None:
+        self.path = Path(path)
+        self.fields = list(fields or HTML_FIELDS)
+        self.flush_every = max(1, int(flush_every))
+        self.count = 0
+        self._f: Optional[IO[str]] = None
+
+    def __enter__(self) -> "HtmlStreamWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def open(self) -> IO[str]:
+        if self._f is None:
+            self._f = self.path.open("w", encoding="utf-8")
+            self._f.write(_HEAD.format(
+                generated=datetime.utcnow().isoformat(),
+                header="".join(f"<th>{escape(h)}</th>" for h in self.fields),
+            ))
+        return self._f
+
+    def _cell(self, field: str, value: Any) -> str:
+        text = "" if value is None else escape(str(value))
+        if field == "profile_url" and text:
+            return f'<td><a href="{text}" target="_blank" rel="noreferrer">{text}</a></td>'
+        return f"<td>{text}</td>"
+
+    def write(self, record: Dict[str, Any]) -> None:
+        f = self.open()
+        record = canonical_fields(record)
+        f.write("<tr>" + "".join(self._cell(h, record.get(h)) for h in self.fields) + "</tr>\n")
+        self.count += 1
+        if self.count % self.flush_every == 0:
+            f.flush()
+
+    def close(self) -> None:
+        if self._f is None:
+            return
+        try:
+            self._f.write(_TAIL)
+        finally:
+            self._f.close()
+            self._f = None
+        logger.info("Wrote HTML to %s (%d records)", self.path, self.count)
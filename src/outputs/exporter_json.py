@@ -1,15 +1,96 @@
 import json
 import logging
 from pathlib import Path
-from typing import Any, List, Dict
+from typing import Any, IO, List, Dict, Mapping, Optional
+
+from extractors.profile_record import as_dict
 
 logger = logging.getLogger(__name__)
 
 def export_json(records: List[Dict[str, Any]], path: Path) -> None:
     try:
         with path.open("w", encoding="utf-8") as f:
-            json.dump(records, f, ensure_ascii=False, indent=2)
+            json.dump([as_dict(r) for r in records], f, ensure_ascii=False, indent=2)
         logger.info("Wrote JSON to %s (%d records)", path, len(records))
     except Exception as e:
         logger.error("Failed to write JSON to %s: %s", path, e)
-        raise
\ No newline at end of file
+        raise
+
+class _StreamingJsonWriter:
+    """
+    Base for incremental JSON writers: records go to disk as they arrive and
+    the file is flushed every `flush_every` records, so memory stays flat and a
+    crash only loses the unflushed tail. The file is opened on the first
+    write; a writer that never receives a record leaves no file behind.
+    """
+
+    def __init__(self, path: Path, flush_every: int = 100) -> None:
+        self.path = Path(path)
+        self.flush_every = max(1, int(flush_every))
+        self.count = 0
+        self._f: Optional[IO[str]] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def open(self) -> IO[str]:
+        """Create the file now; otherwise that happens on the first write."""
+        if self._f is None:
+            self._f = self.path.open("w", encoding="utf-8")
+            self._begin(self._f)
+        return self._f
+
+    def _begin(self, f: IO[str]) -> None:
+        pass
+
+    def _end(self, f: IO[str]) -> None:
+        pass
+
+    def _encode(self, record: Mapping[str, Any]) -> str:
+        raise NotImplementedError
+
+    def write(self, record: Mapping[str, Any]) -> None:
+        f = self.open()
+        f.write(self._encode(record))
+        self.count += 1
+        if self.count % self.flush_every == 0:
+            f.flush()
+
+    def close(self) -> None:
+        if self._f is None:
+            return
+        try:
+            self._end(self._f)
+        finally:
+            self._f.close()
+            self._f = None
+        logger.info("Wrote JSON to %s (%d records)", self.path, self.count)
+
+class JsonArrayWriter(_StreamingJsonWriter):
+    """Streams a JSON array laid out exactly like export_json's indent=2 output."""
+
+    def _begin(self, f: IO[str]) -> None:
+        f.write("[")
+
+    def _encode(self, record: Mapping[str, Any]) -> str:
+        body = json.dumps(as_dict(record), ensure_ascii=False, indent=2).replace("\n", "\n  ")
+        return ("\n  " if self.count == 0 else ",\n  ") + body
+
+    def _end(self, f: IO[str]) -> None:
+        f.write("\n]" if self.count else "]")
+
+class NdjsonWriter(_StreamingJsonWriter):
+    """One compact JSON object per line; every flushed prefix is a valid file."""
+
+    def _encode(self, record: Mapping[str, Any]) -> str:
+        return json.dumps(as_dict(record), ensure_ascii=False, separators=(",", ":")) + "\n"
+
+def open_json_writer(path: Path, fmt: str = "array", flush_every: int = 100) -> _StreamingJsonWriter:
+    if fmt == "ndjson":
+        return NdjsonWriter(path, flush_every=flush_every)
+    if fmt == "array":
+        return JsonArrayWriter(path, flush_every=flush_every)
+    raise ValueError(f"Unsupported JSON format: {fmt}")
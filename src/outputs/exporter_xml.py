@@ -0,0 +1,51 @@
+import logging
+from pathlib import Path
+from typing import Any, Dict, IO, Optional
+from xml.sax.saxutils import escape
+
+logger = logging.getLogger(__name__)
+
+class XmlStreamWriter:
+    """
+    Streams <profiles><profile>...</profile></profiles> one record at a time
+    instead of building an ElementTree for the whole batch. Field names become
+    element names; None is written as an empty element.
+    """
+
+    def __init__(self, path: Path, flush_every: int = 100) -> None:
+        self.path = Path(path)
+        self.flush_every = max(1, int(flush_every))
+        self.count = 0
+        self._f: Optional[IO[str]] = None
+
+    def __enter__(self) -> "XmlStreamWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def open(self) -> IO[str]:
+        if self._f is None:
+            self._f = self.path.open("w", encoding="utf-8")
+            self._f.write("<?xml version='1.0' encoding='utf-8'?>\n<profiles>\n")
+        return self._f
+
+    def write(self, record: Dict[str, Any]) -> None:
+        f = self.open()
+        fields = "".join(
+            f"<{k}>{escape(str(v)) if v is not None else ''}</{k}>" for k, v in record.items()
+        )
+        f.write(f"<profile>{fields}</profile>\n")
+        self.count += 1
+        if self.count % self.flush_every == 0:
+            f.flush()
+
+    def close(self) -> None:
+        if self._f is None:
+            return
+        try:
+            self._f.write("</profiles>\n")
+        finally:
+            self._f.close()
+            self._f = None
+        logger.info("Wrote XML to %s (%d records)", self.path, self.count)
@@ -0,0 +1,224 @@
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from extractors.profile_cache import connect_wal
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    username   TEXT NOT NULL,
+    fetched_at INTEGER NOT NULL,
+    followers  INTEGER,
+    following  INTEGER,
+    posts      INTEGER,
+    PRIMARY KEY (username, fetched_at)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS accounts (
+    username     TEXT PRIMARY KEY,
+    first_seen   INTEGER NOT NULL,
+    last_checked INTEGER NOT NULL,
+    last_changed INTEGER NOT NULL,
+    followers    INTEGER,
+    following    INTEGER,
+    posts        INTEGER,
+    change_rate  REAL NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS failures (
+    username    TEXT PRIMARY KEY,
+    count       INTEGER NOT NULL,
+    last_failed INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+SECONDS_PER_DAY = 86400.0
+
+@dataclass
+class AccountState:
+    username: str
+    last_checked: Optional[int] = None      # None: never fetched successfully
+    last_changed: Optional[int] = None
+    followers: Optional[int] = None
+    following: Optional[int] = None
+    posts: Optional[int] = None
+    change_rate: float = 0.0                # smoothed relative follower change per day
+    failures: int = 0                       # consecutive failed fetches
+    last_failed: Optional[int] = None
+
+def to_epoch(value: Any) -> int:
+    """fetched_at as stored in records (ISO 8601, usually with a Z suffix) to epoch seconds."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str) and value:
+        try:
+            dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=timezone.utc)
+            return int(dt.timestamp())
+        except ValueError:
+            pass
+    return int(time.time())
+
+class HistoryStore:
+    """
+    Follower-count time series in SQLite.
+
+    `observations` is append-only and holds a row only when an account's
+    counts differ from its previous observation, so daily rescrapes of quiet
+    accounts cost nothing. `accounts` keeps the latest counts, when they were
+    last checked and a smoothed change rate; `failures` counts consecutive
+    failed fetches. The refresh scheduler plans from these.
+    """
+
+    # Rows are written inside one transaction per this many records.
+    COMMIT_EVERY = 500
+    # Weight of the newest sample in the smoothed change rate.
+    RATE_SMOOTHING = 0.3
+
+    def __init__(self, path: Union[str, Path], commit_every: Optional[int] = None) -> None:
+        self.path = Path(path)
+        self.commit_every = max(1, int(commit_every or self.COMMIT_EVERY))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Sharded runs share one database; wait for another process's commit
+        # rather than failing with "database is locked".
+        self._conn = connect_wal(self.path)
+        self._conn.executescript(_SCHEMA)
+        self._pending = 0
+        self.changed = 0
+        self.unchanged = 0
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]], root: Path) -> Optional["HistoryStore"]:
+        """Build a store from the "history" settings block, or None if disabled."""
+        if not config or not config.get("enabled", True):
+            return None
+        path = Path(config.get("path") or "data/history.sqlite3")
+        if not path.is_absolute():
+            path = root / path
+        return cls(path, commit_every=config.get("commit_every"))
+
+    def states(self, usernames: Sequence[str]) -> Dict[str, AccountState]:
+        out: Dict[str, AccountState] = {}
+        for i in range(0, len(usernames), 500):
+            chunk = list(usernames[i:i + 500])
+            rows = self._conn.execute(
+                "SELECT username, last_checked, last_changed, followers, following, posts, change_rate "
+                f"FROM accounts WHERE username IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            for row in rows:
+                out[row[0]] = AccountState(*row)
+            rows = self._conn.execute(
+                f"SELECT username, count, last_failed FROM failures WHERE username IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            for username, count, last_failed in rows:
+                state = out.setdefault(username, AccountState(username))
+                state.failures, state.last_failed = count, last_failed
+        return out
+
+    def record_failure(self, username: str, at: Optional[float] = None) -> None:
+        if not self._pending:
+            self._conn.execute("BEGIN")
+        self._pending += 1
+        self._conn.execute(
+            "INSERT INTO failures (username, count, last_failed) VALUES (?, 1, ?) "
+            "ON CONFLICT(username) DO UPDATE SET count = count + 1, last_failed = excluded.last_failed",
+            (username, int(time.time() if at is None else at)),
+        )
+        if self._pending >= self.commit_every:
+            self.commit()
+
+    def record(self, profile: Dict[str, Any]) -> bool:
+        """
+        Note one fetched profile. Appends an observation and returns True if its
+        counts changed (or the account is new); otherwise only the check time moves.
+        A profile fetched before the account was last checked never changes it.
+        """
+        username = profile.get("username")
+        if not username:
+            return False
+        at = to_epoch(profile.get("fetched_at"))
+        counts = (profile.get("followers_count"), profile.get("following_count"), profile.get("posts_count"))
+
+        if not self._pending:
+            self._conn.execute("BEGIN")
+        self._pending += 1
+        self._conn.execute("DELETE FROM failures WHERE username = ?", (username,))
+
+        row = self._conn.execute(
+            "SELECT last_checked, followers, following, posts, change_rate FROM accounts WHERE username = ?",
+            (username,),
+        ).fetchone()
+        if row is not None and at < row[0]:
+            # Older than what the account already records (e.g. a stale cache
+            # hit): keep it in the series, but it must not replace the latest
+            # counts or move the check time backwards.
+            self._conn.execute(
+                "INSERT OR IGNORE INTO observations (username, fetched_at, followers, following, posts) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (username, at, *counts),
+            )
+            self.unchanged += 1
+            changed = False
+        elif row is not None and (row[1], row[2], row[3]) == counts:
+            # Never move the check time backwards (cache hits carry old fetch times).
+            self._conn.execute(
+                "UPDATE accounts SET last_checked = MAX(last_checked, ?) WHERE username = ?", (at, username)
+            )
+            self.unchanged += 1
+            changed = False
+        else:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO observations (username, fetched_at, followers, following, posts) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (username, at, *counts),
+            )
+            rate = self._change_rate(row, counts[0], at)
+            self._conn.execute(
+                "INSERT INTO accounts (username, first_seen, last_checked, last_changed, followers, following, "
+                "posts, change_rate) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(username) DO UPDATE SET last_checked = excluded.last_checked, "
+                "last_changed = excluded.last_changed, followers = excluded.followers, "
+                "following = excluded.following, posts = excluded.posts, change_rate = excluded.change_rate",
+                (username, at, at, at, *counts, rate),
+            )
+            self.changed += 1
+            changed = True
+
+        if self._pending >= self.commit_every:
+            self.commit()
+        return changed
+
+    def _change_rate(self, row: Optional[Tuple[Any, ...]], followers: Optional[int], at: int) -> float:
+        if row is None:
+            return 0.0
+        last_checked, old_followers, _, _, old_rate = row
+        if not old_followers or followers is None:
+            return float(old_rate or 0.0)
+        days = max((at - last_checked) / SECONDS_PER_DAY, 1.0 / 24)
+        sample = abs(followers - old_followers) / old_followers / days
+        return self.RATE_SMOOTHING * sample + (1 - self.RATE_SMOOTHING) * float(old_rate or 0.0)
+
+    def series(self, username: str) -> List[Tuple[int, Optional[int], Optional[int], Optional[int]]]:
+        """(fetched_at, followers, following, posts) for one account, oldest first."""
+        self.commit()
+        return list(self._conn.execute(
+            "SELECT fetched_at, followers, following, posts FROM observations "
+            "WHERE username = ? ORDER BY fetched_at",
+            (username,),
+        ))
+
+    def commit(self) -> None:
+        if self._pending:
+            self._conn.execute("COMMIT")
+            self._pending = 0
+
+    def close(self) -> None:
+        self.commit()
+        self._conn.close()
+        logger.info("History %s: %d changed, %d unchanged", self.path, self.changed, self.unchanged)
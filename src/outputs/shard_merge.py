@@ -0,0 +1,105 @@
+import logging
+import shutil
+from pathlib import Path
+from typing import IO, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+_CHUNK = 1 << 20
+
+def part_path(path: Path, index: int, shards: int) -> Path:
+    """Where shard `index` of `shards` writes its part of `path`."""
+    path = Path(path)
+    return path.with_name(f"{path.stem}.part-{index:03d}-of-{shards:03d}{path.suffix}")
+
+def existing_parts(path: Path, shards: int) -> List[Path]:
+    """The parts of `path` present on disk, in shard order; missing ones are logged."""
+    parts = []
+    for index in range(shards):
+        part = part_path(path, index, shards)
+        if part.exists():
+            parts.append(part)
+        else:
+            logger.warning("Shard %d/%d has no output at %s", index, shards, part)
+    return parts
+
+def _copy(src: IO[bytes], dst: IO[bytes], length: int) -> None:
+    while length > 0:
+        chunk = src.read(min(_CHUNK, length))
+        if not chunk:
+            raise ValueError(f"{src.name} ended early")
+        dst.write(chunk)
+        length -= len(chunk)
+
+def _frame(part: Path, head_end: Optional[bytes], footer: bytes) -> Tuple[bytes, int, int]:
+    """(header, body offset, body length) of one part."""
+    size = part.stat().st_size
+    with part.open("rb") as f:
+        head = b""
+        if head_end is not None:
+            first = f.read(_CHUNK)
+            at = first.find(head_end)
+            if at < 0:
+                raise ValueError(f"{part} has no header; was its shard interrupted?")
+            head = first[:at + len(head_end)]
+        if footer:
+            f.seek(max(len(head), size - len(footer)))
+            if f.read() != footer:
+                raise ValueError(f"{part} is truncated; was its shard interrupted?")
+    return head, len(head), size - len(head) - len(footer)
+
+def splice_parts(
+    parts: Sequence[Path],
+    path: Path,
+    head_end: Optional[bytes] = None,
+    footer: bytes = b"",
+    separator: bytes = b"",
+) -> None:
+    """
+    Merge text outputs written by the same writer without parsing a record:
+    the header (everything up to and including `head_end`) comes from the
+    first part, then every part's body, then `footer` once. Non-empty bodies
+    are joined with `separator`.
+    """
+    frames = [(part, *_frame(part, head_end, footer)) for part in parts]
+    with Path(path).open("wb") as out:
+        out.write(frames[0][1] if frames else b"")
+        first = True
+        for part, _, offset, length in frames:
+            if length <= 0:
+                continue
+            if not first:
+                out.write(separator)
+            with part.open("rb") as f:
+                f.seek(offset)
+                _copy(f, out, length)
+            first = False
+        out.write(footer)
+
+def concat_parts(parts: Sequence[Path], path: Path) -> None:
+    with Path(path).open("wb") as out:
+        for part in parts:
+            with part.open("rb") as f:
+                shutil.copyfileobj(f, out, _CHUNK)
+
+def merge_json_parts(parts: Sequence[Path], path: Path, json_format: str = "array", **_: object) -> None:
+    if json_format == "ndjson":
+        concat_parts(parts, path)
+    else:
+        # JsonArrayWriter writes "[", "\n  {...}", ",\n  {...}", ..., "\n]"; or "[]" when empty.
+        filled = [part for part in parts if part.stat().st_size > 2]
+        if filled:
+            splice_parts(filled, path, head_end=b"[", footer=b"\n]", separator=b",")
+        else:
+            Path(path).write_text("[]", encoding="utf-8")
+
+def merge_csv_parts(parts: Sequence[Path], path: Path, **_: object) -> None:
+    splice_parts(parts, path, head_end=b"\n")
+
+def merge_xml_parts(parts: Sequence[Path], path: Path, **_: object) -> None:
+    splice_parts(parts, path, head_end=b"<profiles>\n", footer=b"</profiles>\n")
+
+def merge_html_parts(parts: Sequence[Path], path: Path, **_: object) -> None:
+    from .exporter_html import _TAIL
+
+    splice_parts(parts, path, head_end=b"<tbody>\n", footer=_TAIL.encode("utf-8"))
@@ -0,0 +1,132 @@
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from extractors.metrics import REGISTRY
+from .shard_merge import merge_csv_parts, merge_html_parts, merge_json_parts, merge_xml_parts
+
+logger = logging.getLogger(__name__)
+
+# A record writer is any object with `path`, `count`, open(), write(record)
+# and close(); the stream writers in this package all qualify.
+WriterFactory = Callable[..., Any]
+# merger(parts, path, **options) combines shard outputs of one format into path.
+PartMerger = Callable[..., None]
+
+_WRITERS: Dict[str, Tuple[str, WriterFactory]] = {}
+_MERGERS: Dict[str, PartMerger] = {}
+
+def register_writer(name: str, suffix: str, factory: WriterFactory, merger: Optional[PartMerger] = None) -> None:
+    """Make an output format available to the CLI and OutputFormatter.
+
+    `factory(path, **options)` must return a record writer; options it does
+    not understand should be ignored. `merger`, if given, lets sharded runs
+    combine their partial outputs in this format.
+    """
+    _WRITERS[name] = (suffix, factory)
+    if merger is not None:
+        _MERGERS[name] = merger
+
+def available_formats() -> List[str]:
+    return sorted(_WRITERS)
+
+def writer_suffix(name: str) -> str:
+    return _WRITERS[name][0]
+
+def open_writer(name: str, path: Path, **options: Any) -> Any:
+    try:
+        _, factory = _WRITERS[name]
+    except KeyError:
+        raise ValueError(f"Unsupported output format: {name}") from None
+    return factory(Path(path), **options)
+
+def merge_parts(name: str, parts: Sequence[Path], path: Path, **options: Any) -> None:
+    """Combine the shard outputs `parts` (in shard order) into one `path`."""
+    try:
+        merger = _MERGERS[name]
+    except KeyError:
+        raise ValueError(f"Output format {name} cannot be merged from shards") from None
+    with REGISTRY.timer("merge_seconds", format=name):
+        merger([Path(p) for p in parts], Path(path), **options)
+
+def _json(path: Path, json_format: str = "array", flush_every: int = 100, **_: Any) -> Any:
+    from .exporter_json import open_json_writer
+
+    return open_json_writer(path, json_format, flush_every=flush_every)
+
+def _csv(path: Path, flush_every: int = 100, **_: Any) -> Any:
+    from .exporter_csv import CsvStreamWriter
+
+    return CsvStreamWriter(path, flush_every=flush_every)
+
+def _xml(path: Path, flush_every: int = 100, **_: Any) -> Any:
+    from .exporter_xml import XmlStreamWriter
+
+    return XmlStreamWriter(path, flush_every=flush_every)
+
+def _html(path: Path, flush_every: int = 100, **_: Any) -> Any:
+    from .exporter_html import HtmlStreamWriter
+
+    return HtmlStreamWriter(path, flush_every=flush_every)
+
+def _columnar(fmt: str) -> WriterFactory:
+    def factory(path: Path, batch_size: int = 65536, **_: Any) -> Any:
+        from .exporter_arrow import ArrowStreamWriter
+
+        return ArrowStreamWriter(path, fmt, batch_size=batch_size)
+
+    return factory
+
+def _merge_columnar(fmt: str) -> PartMerger:
+    def merger(parts: Sequence[Path], path: Path, **_: Any) -> None:
+        from .exporter_arrow import merge_columnar_parts
+
+        merge_columnar_parts(parts, path, fmt)
+
+    return merger
+
+register_writer("json", ".json", _json, merge_json_parts)
+register_writer("csv", ".csv", _csv, merge_csv_parts)
+register_writer("xml", ".xml", _xml, merge_xml_parts)
+register_writer("html", ".html", _html, merge_html_parts)
+register_writer("parquet", ".parquet", _columnar("parquet"), _merge_columnar("parquet"))
+register_writer("arrow", ".arrow", _columnar("arrow"), _merge_columnar("arrow"))
+
+class MultiWriter:
+    """
+    Fans one record stream out to several writers in a single pass. Export
+    time is recorded per format; close() closes every writer even if one fails.
+    """
+
+    def __init__(self, writers: Sequence[Tuple[str, Any]]) -> None:
+        self.writers = list(writers)
+        self.count = 0
+
+    def __enter__(self) -> "MultiWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def open(self) -> "MultiWriter":
+        """Create every output now, so an empty stream still leaves valid empty files."""
+        for _, writer in self.writers:
+            writer.open()
+        return self
+
+    def write(self, record: Dict[str, Any]) -> None:
+        for name, writer in self.writers:
+            with REGISTRY.timer("export_seconds", format=name):
+                writer.write(record)
+        self.count += 1
+
+    def close(self) -> None:
+        error = None
+        for name, writer in self.writers:
+            try:
+                writer.close()
+            except Exception as e:
+                logger.error("Failed to finish %s output %s: %s", name, writer.path, e)
+                error = error or e
+        if error is not None:
+            raise error
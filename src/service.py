@@ -0,0 +1,280 @@
+import json
+import logging
+import os
+import signal
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from extractors.data_cleaner import is_valid_username, normalize_username
+from extractors.instagram_parser import InstagramParser
+from extractors.metrics import REGISTRY
+from extractors.outcomes import LOGIN_REQUIRED, NOT_FOUND, OK, RATE_LIMITED, TRANSIENT, FetchResult
+from extractors.profile_record import ProfileRecord, as_dict
+from outputs.history_store import to_epoch
+
+logger = logging.getLogger(__name__)
+
+class ProfileService:
+    """
+    Answers profile lookups for a long-running process. The parser (and with
+    it the HTTP sessions, keep-alive connections and SQLite profile cache) is
+    created once and reused, fresh profiles are also held in an in-memory LRU
+    in front of the SQLite cache, and concurrent lookups of the same username
+    share a single fetch.
+    """
+
+    def __init__(
+        self,
+        parser: InstagramParser,
+        concurrency: int = 5,
+        ttl_seconds: float = 86400,
+        max_entries: int = 100_000,
+        timeout_seconds: float = 30.0,
+    ) -> None:
+        self.parser = parser
+        self.ttl_seconds = float(ttl_seconds)
+        self.max_entries = max(1, int(max_entries))
+        self.timeout_seconds = float(timeout_seconds)
+        self._memory: "OrderedDict[str, Tuple[float, ProfileRecord]]" = OrderedDict()
+        self._inflight: Dict[str, "Future[FetchResult]"] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, int(concurrency)), thread_name_prefix="lookup")
+
+    def submit(self, username: str) -> "Future[FetchResult]":
+        """
+        Future for one lookup: already resolved on a memory hit, otherwise the
+        fetch in flight for this username, started now if there is none.
+        Raises ValueError for a username that is not a valid handle.
+        """
+        key = normalize_username(username)
+        if not is_valid_username(key):
+            raise ValueError(f"Invalid username: {username!r}")
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] > time.time():
+                self._memory.move_to_end(key)
+                REGISTRY.inc("service_lookups_total", result="memory")
+                done: "Future[FetchResult]" = Future()
+                hit = entry[1].copy()
+                hit.source = "cache"
+                done.set_result(FetchResult(hit, OK))
+                return done
+            future = self._inflight.get(key)
+            if future is not None:
+                REGISTRY.inc("service_lookups_total", result="coalesced")
+                return future
+            REGISTRY.inc("service_lookups_total", result="fetch")
+            future = self._inflight[key] = self._pool.submit(self._fetch, key)
+            return future
+
+    def _fetch(self, username: str) -> FetchResult:
+        try:
+            result = self.parser.fetch(username)
+        except Exception as e:
+            logger.exception("Error looking up '%s': %s", username, e)
+            result = FetchResult(None, TRANSIENT)
+        profile = result.profile
+        if profile:
+            profile.setdefault("fetched_at", datetime.utcnow().isoformat() + "Z")
+            profile.setdefault("source", "live")
+        with self._lock:
+            self._inflight.pop(username, None)
+            if profile:
+                # Cached profiles keep their original fetch time, so they expire
+                # from memory when they would have expired from the SQLite cache.
+                self._memory[username] = (to_epoch(profile["fetched_at"]) + self.ttl_seconds, profile)
+                self._memory.move_to_end(username)
+                while len(self._memory) > self.max_entries:
+                    self._memory.popitem(last=False)
+        return result
+
+    def lookup(self, username: str) -> Tuple[Optional[Dict[str, Any]], str]:
+        """
+        (profile as a dict, outcome) for one username; the profile is None
+        unless the outcome is OK. Raises TimeoutError when slow.
+        """
+        with REGISTRY.timer("service_lookup_seconds", kind="single"):
+            profile, outcome = self.submit(username).result(timeout=self.timeout_seconds)
+        return (as_dict(profile) if profile else None), outcome
+
+    def lookup_many(self, usernames: List[str]) -> Dict[str, Any]:
+        """
+        {username: profile} for a batch, fetched concurrently. Failed lookups,
+        invalid handles and lookups still pending at the timeout map to
+        {"error": reason}.
+        """
+        futures: Dict[str, Any] = {}
+        for username in usernames:
+            try:
+                futures[username] = self.submit(username)
+            except ValueError:
+                futures[username] = "invalid_username"
+        deadline = time.monotonic() + self.timeout_seconds
+        results: Dict[str, Any] = {}
+        with REGISTRY.timer("service_lookup_seconds", kind="batch"):
+            for username, future in futures.items():
+                if isinstance(future, str):
+                    results[username] = {"error": future}
+                    continue
+                try:
+                    profile, outcome = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                except FutureTimeout:
+                    results[username] = {"error": "timeout"}
+                    continue
+                results[username] = as_dict(profile) if profile else {"error": outcome}
+        return results
+
+    def warm(self) -> None:
+        """Open keep-alive connections to both Instagram hosts before the first lookup."""
+        for base in (self.parser.api_base, self.parser.web_base):
+            self.parser.http.warm(base + "/")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            memory, inflight = len(self._memory), len(self._inflight)
+        cache = self.parser.cache
+        return {
+            "memory_entries": memory,
+            "in_flight": inflight,
+            "cache_hits": cache.hits if cache is not None else None,
+            "cache_misses": cache.misses if cache is not None else None,
+            "cache_negative_hits": cache.negative_hits if cache is not None else None,
+            "circuits": self.parser.breaker.snapshot(),
+        }
+
+    def close(self) -> None:
+        # Queued lookups are dropped; running ones finish so the cache can be closed after.
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+_ERROR_STATUS = {NOT_FOUND: 404, LOGIN_REQUIRED: 403, RATE_LIMITED: 503, TRANSIENT: 502}
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    GET  /profiles/<username>            one profile; on failure an error named after the
+                                         outcome: 404 not_found, 403 login_required,
+                                         503 rate_limited, 502 transient
+    GET  /profiles?username=a,b          a batch, as {"results": {username: profile|{"error": ...}}}
+    POST /profiles {"usernames": [...]}  the same batch, for long lists
+    GET  /healthz                        liveness and cache figures
+    GET  /metrics                        Prometheus metrics
+    """
+
+    server_version = "igscraper"
+    protocol_version = "HTTP/1.1"
+    service: ProfileService
+    max_batch: int
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        if url.path.startswith("/profiles/"):
+            self._single(unquote(url.path[len("/profiles/"):]).strip("/"))
+        elif url.path == "/profiles":
+            names = [n for v in parse_qs(url.query).get("username", []) for n in v.split(",") if n.strip()]
+            self._batch(names)
+        elif url.path == "/healthz":
+            self._json(200, {"status": "ok", **self.service.stats()})
+        elif url.path == "/metrics":
+            self._send(200, REGISTRY.to_prometheus().encode("utf-8"), "text/plain; version=0.0.4")
+        else:
+            self._json(404, {"error": "not_found"})
+
+    def do_POST(self) -> None:
+        if urlsplit(self.path).path != "/profiles":
+            self._json(404, {"error": "not_found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+            names = body["usernames"]
+            if not isinstance(names, list) or not all(isinstance(n, str) for n in names):
+                raise TypeError
+        except (ValueError, KeyError, TypeError):
+            self._json(400, {"error": 'expected {"usernames": ["...", ...]}'})
+            return
+        self._batch(names)
+
+    def _single(self, username: str) -> None:
+        try:
+            profile, outcome = self.service.lookup(username)
+        except ValueError:
+            self._json(400, {"error": "invalid_username", "username": username})
+        except FutureTimeout:
+            self._json(504, {"error": "timeout", "username": username})
+        else:
+            if profile is None:
+                self._json(_ERROR_STATUS.get(outcome, 502), {"error": outcome, "username": username})
+            else:
+                self._json(200, profile)
+
+    def _batch(self, names: List[str]) -> None:
+        if not names:
+            self._json(400, {"error": "no usernames given"})
+        elif len(names) > self.max_batch:
+            self._json(413, {"error": f"at most {self.max_batch} usernames per request"})
+        else:
+            self._json(200, {"results": self.service.lookup_many(names)})
+
+    def _json(self, status: int, payload: Any) -> None:
+        self._send(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json")
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self) -> str:
+        # Unix socket peers have no (host, port) address.
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, fmt: str, *args: Any) -> None:
+        logger.debug("%s %s", self.address_string(), fmt % args)
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+def parse_address(value: str, default_host: str, default_port: int) -> Tuple[str, Any]:
+    """'' / 'PORT' / 'HOST:PORT' -> ("tcp", (host, port)); 'unix:PATH' -> ("unix", PATH)."""
+    if value.startswith("unix:"):
+        return "unix", value[len("unix:"):]
+    host, _, port = value.rpartition(":")
+    try:
+        return "tcp", (host or default_host, int(port) if port else default_port)
+    except ValueError:
+        raise ValueError(f"Invalid listen address '{value}': expected PORT, HOST:PORT or unix:PATH") from None
+
+def serve(service: ProfileService, address: Tuple[str, Any], max_batch: int = 500) -> None:
+    """Serve lookups until SIGINT/SIGTERM."""
+    handler = type("Handler", (_Handler,), {"service": service, "max_batch": int(max_batch)})
+    kind, where = address
+    if kind == "unix":
+        if os.path.exists(where):
+            os.unlink(where)
+        server: socketserver.BaseServer = _UnixHTTPServer(where, handler)
+        shown = f"unix:{where}"
+    else:
+        server = ThreadingHTTPServer(where, handler)
+        server.daemon_threads = True
+        shown = "http://%s:%d" % server.server_address[:2]
+
+    # SIGTERM (systemd, docker stop) shuts down like Ctrl-C.
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    logger.info("Serving profile lookups on %s", shown)
+    print(f"Serving profile lookups on {shown}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down")
+    finally:
+        server.server_close()
+        service.close()
+        if kind == "unix" and os.path.exists(where):
+            os.unlink(where)